@@ -0,0 +1,321 @@
+"""Local JSON query API over the dashboard's aggregates.
+
+Serves the numbers behind the KPI cards, the rivals chart, the top scorers
+chart and the World Cup goal difference waterfall for a (team, year range,
+tournaments) selection, from the same preprocessed ``Dataset`` (on-disk cache
+and ``DASHBOARD_TEAMS``/``DASHBOARD_TOURNAMENTS`` slice) as app.py:
+
+    python api.py [--host 127.0.0.1] [--port 8502]
+
+    GET  /teams
+    GET  /kpis?team=Argentina&from=1978&to=2022&tournament=FIFA+World+Cup
+    GET  /h2h?team=Argentina&limit=10            (also /top_scorers, /wc_goal_difference)
+    POST /batch   {"queries": [{"query": "kpis", "team": "Brazil", "from": 1950}, ...]}
+
+Omitted filters default to the dashboard's initial sidebar state for the
+team, except that ``wc_goal_difference`` covers every edition (as the
+waterfall does) unless a year range is given; it and ``top_scorers`` ignore
+tournaments.
+
+Every answer carries an ETag derived from the data fingerprint and the
+normalized query, so a request with a matching ``If-None-Match`` (or a batch
+entry with a matching ``"etag"``) gets a 304 without the query being run;
+answers themselves are kept in an LRU. ``QueryAPI`` is a plain WSGI app and
+``Client`` calls it in-process, without sockets.
+"""
+import argparse
+import hashlib
+import io
+import json
+import socketserver
+from urllib.parse import parse_qs, urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from wsgiref.util import setup_testing_defaults
+
+import charts
+import profiling
+from charts import FigureCache
+from filters import default_filters
+from pipeline import Dataset, data_slice
+
+STATUS = {200: "200 OK", 304: "304 Not Modified", 400: "400 Bad Request",
+          404: "404 Not Found", 405: "405 Method Not Allowed"}
+
+RESULTS = FigureCache(maxsize=1024)   # answers by (query, token, normalized params)
+
+
+class QueryError(ValueError):
+    """A query the API cannot answer; ``status`` is the HTTP status to send."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+# Each takes the dataset, the team, the year range and tournaments (defaults
+# already applied) and the row limit, and returns plain JSON-able data.
+def kpis(ds, team, year_range, tournaments, limit):
+    """The KPI cards: totals over the selection and the win rate in percent."""
+    totals = ds.cube.team(team).totals(*year_range, tournaments=tournaments)
+    matches = totals["matches"]
+    return {**totals, "win_pct": round(totals["wins"] / matches * 100, 1) if matches else 0}
+
+
+def head_to_head(ds, team, year_range, tournaments, limit):
+    """Record against the ``limit`` (default 10) most-played opponents."""
+    top = ds.h2h.top(team, limit or 10, year_range, tournaments)
+    return top.drop(columns="first").to_dict("records")
+
+
+def top_scorers(ds, team, year_range, tournaments, limit):
+    """The ``limit`` (default 15) leading scorers in the year range, most goals first."""
+    top = ds.scorers.team(team).top(limit or 15, *year_range)
+    return top.rename(columns=str.lower).to_dict("records")
+
+
+def wc_goal_difference(ds, team, year_range, tournaments, limit):
+    """World Cup goals for/against and difference per edition in the year range."""
+    wc = charts.waterfall_data(ds, team)
+    first, last = year_range
+    return wc[(wc["year"] >= first) & (wc["year"] <= last)].to_dict("records")
+
+
+QUERIES = {
+    "kpis":               kpis,
+    "h2h":                head_to_head,
+    "top_scorers":        top_scorers,
+    "wc_goal_difference": wc_goal_difference,
+}
+WHOLE_HISTORY = {"wc_goal_difference"}   # default year range: every year played
+
+
+# ── Query engine ──────────────────────────────────────────────────────────────
+def _int(value, name):
+    if value is None:
+        return None
+    error = QueryError(f"{name} must be an integer, not {value!r}")
+    # JSON true/false and 1999.7 would otherwise pass as 1/0 and 1999.
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise error
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise error from None
+
+
+def normalize(teams, query, params):
+    """Validated ``(query, params)`` with params in a canonical, hashable form.
+
+    ``params`` holds ``team`` and optionally ``from``, ``to``, ``tournaments``
+    (a list) and ``limit``; filters left out stay None until ``answer``.
+    """
+    if not isinstance(query, str) or query not in QUERIES:
+        raise QueryError(f"unknown query {query!r}; expected one of {', '.join(QUERIES)}", 404)
+    team = params.get("team")
+    if not isinstance(team, str) or not team:
+        raise QueryError("team is required")
+    if team not in teams:
+        raise QueryError(f"unknown team {team!r}", 404)
+    first, last, limit = (_int(params.get(name), name) for name in ("from", "to", "limit"))
+    if first is not None and last is not None and first > last:
+        raise QueryError(f"from ({first}) is after to ({last})")
+    if limit is not None and limit < 1:
+        raise QueryError("limit must be positive")
+    tournaments = params.get("tournaments")
+    if tournaments is not None:
+        if not isinstance(tournaments, list) or not all(isinstance(t, str) for t in tournaments):
+            raise QueryError("tournaments must be a list of names")
+        tournaments = tuple(sorted(set(tournaments)))
+    return query, (("team", team), ("from", first), ("to", last),
+                   ("tournaments", tournaments), ("limit", limit))
+
+
+def etag(ds, query, params):
+    """Strong validator of one normalized query against the loaded data."""
+    key = json.dumps([ds.token, query, params], separators=(",", ":"))
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def answer(ds, query, params):
+    """Result of one normalized query, from the LRU when already answered."""
+    def run():
+        p = dict(params)
+        team = p["team"]
+        years, year_range, tournaments = default_filters(ds.matches(team),
+                                                         charts.MAJOR_TOURNAMENTS)
+        first, last = years if query in WHOLE_HISTORY else year_range
+        if p["from"] is not None:
+            first = p["from"]
+        if p["to"] is not None:
+            last = p["to"]
+        if p["tournaments"] is not None:
+            tournaments = list(p["tournaments"])
+        with profiling.stage(f"api:{query}"):
+            return QUERIES[query](ds, team, (first, last), tournaments, p["limit"])
+    return RESULTS.get_or_build((query, ds.token, params), run)
+
+
+def _matches(header, tag):
+    """Whether an ``If-None-Match`` header value matches ``tag``."""
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == tag for value in candidates)
+
+
+# ── WSGI app ──────────────────────────────────────────────────────────────────
+class QueryAPI:
+    """WSGI application answering ``QUERIES`` over one loaded ``Dataset``."""
+
+    def __init__(self, ds=None):
+        self.ds    = ds or Dataset.load(**data_slice())
+        self.teams = frozenset(self.ds.teams())
+
+    def __call__(self, environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        route  = environ.get("PATH_INFO", "/").strip("/")
+        try:
+            if route == "batch":
+                if method != "POST":
+                    raise QueryError("use POST for /batch", 405)
+                status, body, tag = 200, self.batch(self._body(environ)), None
+            elif method not in ("GET", "HEAD"):
+                raise QueryError(f"use GET for /{route}", 405)
+            elif route == "teams":
+                status, body, tag = 200, sorted(self.teams), None
+            else:
+                query, params = normalize(self.teams, route, self._query_params(environ))
+                tag = etag(self.ds, query, params)
+                if _matches(environ.get("HTTP_IF_NONE_MATCH"), tag):
+                    status, body = 304, None
+                else:
+                    status, body = 200, answer(self.ds, query, params)
+        except QueryError as exc:
+            status, body, tag = exc.status, {"error": str(exc)}, None
+
+        payload = b"" if body is None else json.dumps(body).encode()
+        headers = [("Content-Type", "application/json"),
+                   ("Content-Length", str(len(payload)))]
+        if tag:
+            headers += [("ETag", tag), ("Cache-Control", "no-cache")]
+        start_response(STATUS[status], headers)
+        return [payload if method != "HEAD" else b""]
+
+    def batch(self, request):
+        """Answer ``request["queries"]`` in order; errors are per entry.
+
+        An entry whose ``"etag"`` still matches gets ``{"status": 304}``
+        instead of its data.
+        """
+        queries = request.get("queries") if isinstance(request, dict) else None
+        if not isinstance(queries, list):
+            raise QueryError('expected {"queries": [...]}')
+        results = []
+        for entry in queries:
+            try:
+                if not isinstance(entry, dict):
+                    raise QueryError("each query must be an object")
+                query, params = normalize(self.teams, entry.get("query"), entry)
+                tag = etag(self.ds, query, params)
+                if entry.get("etag") == tag:
+                    results.append({"status": 304, "etag": tag})
+                else:
+                    results.append({"status": 200, "etag": tag,
+                                    "data": answer(self.ds, query, params)})
+            except QueryError as exc:
+                results.append({"status": exc.status, "error": str(exc)})
+        return {"results": results}
+
+    @staticmethod
+    def _query_params(environ):
+        fields = parse_qs(environ.get("QUERY_STRING", ""), keep_blank_values=True)
+        params = {name: values[-1] for name, values in fields.items()}
+        if "tournament" in fields:
+            params["tournaments"] = fields["tournament"]
+        params.pop("tournament", None)
+        return params
+
+    @staticmethod
+    def _body(environ):
+        try:
+            size = int(environ.get("CONTENT_LENGTH") or 0)
+            return json.loads(environ["wsgi.input"].read(size) or b"{}")
+        except ValueError:
+            raise QueryError("request body is not valid JSON") from None
+
+
+# ── In-process client ─────────────────────────────────────────────────────────
+class Response:
+    """Status code, headers (a dict) and raw body of one ``Client`` request."""
+
+    def __init__(self, status, headers, body):
+        self.status  = status
+        self.headers = headers
+        self.body    = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class Client:
+    """Calls a WSGI app directly, as an HTTP client would, without sockets."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, path, body=b"", headers=None):
+        url = urlsplit(path)
+        environ = {"REQUEST_METHOD": method, "PATH_INFO": url.path,
+                   "QUERY_STRING": url.query, "CONTENT_LENGTH": str(len(body)),
+                   "wsgi.input": io.BytesIO(body)}
+        for name, value in (headers or {}).items():
+            environ["HTTP_" + name.upper().replace("-", "_")] = value
+        setup_testing_defaults(environ)
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started["status"]  = int(status.split()[0])
+            started["headers"] = dict(response_headers)
+
+        payload = b"".join(self.app(environ, start_response))
+        return Response(started["status"], started["headers"], payload)
+
+    def get(self, path, headers=None):
+        return self.request("GET", path, headers=headers)
+
+    def post(self, path, data, headers=None):
+        return self.request("POST", path, json.dumps(data).encode(), headers)
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8502, ds=None):
+    """Serve ``QueryAPI`` until interrupted."""
+    app = QueryAPI(ds)
+    with make_server(host, port, app, ThreadingWSGIServer, QuietHandler) as server:
+        print(f"serving {len(app.teams)} teams on http://{host}:{server.server_port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+    serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
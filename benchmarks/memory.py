@@ -0,0 +1,67 @@
+"""Memory of the raw and preprocessed tables before and after the compact schema.
+
+"Before" parses the CSVs with pandas' default dtypes, as the pipeline did
+originally; "after" uses ``pipeline.SCHEMA``. Both are run through the same
+``preprocess`` so the derived tables are compared too. Run from the
+repository root:
+
+    python -m benchmarks.memory [--scale 10] [--json PATH]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+import profiling
+from benchmarks.synthetic import write_scaled_dataset
+from pipeline import DATA_DIR, DATA_FILES, preprocess, read_raw
+
+
+def read_default(data_dir):
+    """The three CSVs with default dtypes and ``date`` parsed."""
+    frames = [pd.read_csv(os.path.join(data_dir, name)) for name in DATA_FILES]
+    for frame in frames:
+        frame["date"] = pd.to_datetime(frame["date"])
+    return frames
+
+
+def footprint(frames):
+    """Deep MB of the raw frames and of every table ``preprocess`` derives."""
+    raw = dict(zip((name.removesuffix(".csv") for name in DATA_FILES), frames))
+    return {"raw": profiling.frame_mb(raw), "tables": profiling.frame_mb(preprocess(*frames))}
+
+
+def report(data_dir):
+    before = footprint(read_default(data_dir))
+    after  = footprint(read_raw(data_dir))
+    print(f"{'':<8} {'table':<12} {'before MB':>10} {'after MB':>10} {'ratio':>7}")
+    for group in ("raw", "tables"):
+        rows = list(before[group]) + ["total"]
+        before[group]["total"] = round(sum(before[group].values()), 2)
+        after[group]["total"]  = round(sum(after[group].values()), 2)
+        for name in rows:
+            old, new = before[group][name], after[group][name]
+            print(f"{group:<8} {name:<12} {old:>10.2f} {new:>10.2f} "
+                  f"{old / max(new, 1e-6):>6.1f}x")
+    return {"before": before, "after": after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1,
+                        help="measure synthetic data scaled this many times")
+    parser.add_argument("--json", help="also write the report to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = DATA_DIR if args.scale == 1 else write_scaled_dataset(args.scale, tmp, DATA_DIR)
+        result = report(data_dir)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
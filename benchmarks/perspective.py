@@ -0,0 +1,73 @@
+"""Compare the vectorized team perspective with the old row-wise ``apply``.
+
+Run from the repository root:
+
+    python -m benchmarks.perspective [--team Argentina] [--scales 1 10 100]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_results
+from pipeline import team_perspective
+
+
+def legacy_perspective(results, team):
+    """The original row-wise implementation from ``load_data``."""
+    side = results[(results["home_team"] == team) |
+                   (results["away_team"] == team)].copy()
+
+    def decompose(row):
+        if row["home_team"] == team:
+            return row["home_score"], row["away_score"], row["away_team"], True
+        return row["away_score"], row["home_score"], row["home_team"], False
+
+    decomposed = side.apply(
+        lambda r: pd.Series(decompose(r),
+                            index=["arg_scored","arg_conceded","opponent","is_home"]), axis=1)
+    side = pd.concat([side, decomposed], axis=1)
+
+    side["result"] = side.apply(
+        lambda r: "Win"  if r["arg_scored"] > r["arg_conceded"]
+        else ("Draw" if r["arg_scored"] == r["arg_conceded"] else "Loss"), axis=1)
+    side["year"]   = side["date"].dt.year
+    side["decade"] = (side["year"] // 10 * 10).astype(str) + "s"
+    return side
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--team", default="Argentina")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = pd.read_csv("results.csv")
+    results["date"] = pd.to_datetime(results["date"])
+
+    print(f"{'rows':>10} {'team rows':>10} {'legacy s':>10} {'vector s':>10} {'speedup':>8}")
+    for scale in args.scales:
+        data = synthetic_results(results, scale)
+        t_new, new = best_of(lambda: team_perspective(data, args.team), args.repeat)
+        t_old, old = best_of(lambda: legacy_perspective(data, args.team), 1)
+
+        old = old.rename(columns={"arg_scored": "scored", "arg_conceded": "conceded"})
+        new = new.drop(columns=["team", "venue"]).astype({"result": str, "decade": str})
+        pd.testing.assert_frame_equal(new, old,
+                                      check_dtype=False, check_like=True)
+        print(f"{len(data):>10,} {len(new):>10,} {t_old:>10.4f} {t_new:>10.4f} "
+              f"{t_old / t_new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Load test: memory per dashboard session and per server process.
+
+"sessions" runs app.py headless as a series of fresh Streamlit sessions
+(``AppTest``) in one process and samples RSS after each; the dataset is a
+``st.cache_resource`` of memory-mapped tables, so only the first session
+should pay for it and later ones should add roughly nothing.
+
+"processes" starts several processes that load the dataset from the on-disk
+cache at the same time, either mapped (what ``Dataset.load`` does) or as
+private in-memory copies (what a pickled or re-parsed load would cost), and
+reports each one's proportional set size (PSS), which splits shared pages
+evenly between the processes that map them. PSS needs Linux's /proc.
+
+    python -m benchmarks.sessions [--sessions 10] [--processes 4] [--json PATH]
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+import profiling
+from pipeline import Dataset
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def pss_mb():
+    """Proportional set size of this process in MB, or None without /proc."""
+    try:
+        with open("/proc/self/smaps_rollup") as fh:
+            for line in fh:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def touch(tables):
+    """Read every byte of every column so mapped pages are resident."""
+    total = 0
+    for table in tables.values():
+        for column in [table.index] + [table[name] for name in table.columns]:
+            values = column.array
+            if isinstance(values, pd.Categorical):
+                values = values.codes
+            elif isinstance(values, pd.arrays.IntegerArray):
+                values = values.isna()
+            values = np.asarray(values)
+            if values.dtype != object:
+                total += int(np.ascontiguousarray(values).view(np.uint8).sum())
+    return total
+
+
+def _process(mode, barrier):
+    ds = Dataset.load()
+    tables = ds.tables
+    if mode == "private":
+        tables = {name: table.copy(deep=True) for name, table in tables.items()}
+    touch(tables)
+    barrier.wait()                 # every process holds its tables now
+    result = {"rss_mb": round(profiling.rss_mb(), 1), "pss_mb": pss_mb()}
+    barrier.wait()                 # nobody exits before everyone measured
+    return result
+
+
+def measure_processes(mode, count):
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        barrier = manager.Barrier(count)
+        with context.Pool(count) as pool:
+            return pool.starmap(_process, [(mode, barrier)] * count)
+
+
+def measure_sessions(count, team):
+    from streamlit.testing.v1 import AppTest
+
+    samples = [round(profiling.rss_mb(), 1)]
+    for _ in range(count):
+        session = AppTest.from_file(APP, default_timeout=120)
+        session.run()
+        if team:
+            session.selectbox[0].select(team).run()
+        del session
+        gc.collect()
+        samples.append(round(profiling.rss_mb(), 1))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--team", help="team each session selects (default: the app's)")
+    parser.add_argument("--json", help="also write the report to this path")
+    args = parser.parse_args()
+
+    Dataset.load()   # make sure the cache entry exists before anything maps it
+    report = {"processes": {}}
+    for mode in ("mapped", "private"):   # before the sessions: AppTest swaps out __main__
+        rows = measure_processes(mode, args.processes)
+        report["processes"][mode] = rows
+        pss = [row["pss_mb"] for row in rows]
+        detail = (f"PSS {sum(pss):.0f} MB total, {sum(pss) / len(pss):.0f} MB per process"
+                  if None not in pss else "PSS unavailable")
+        print(f"{args.processes} processes, {mode:<7}: {detail}; "
+              f"RSS {sum(row['rss_mb'] for row in rows) / len(rows):.0f} MB each")
+
+    rss = report["sessions"] = measure_sessions(args.sessions, args.team)
+    print(f"sessions: RSS {rss[0]:.0f} MB before, {rss[1]:.0f} MB after the first, "
+          f"{rss[-1]:.0f} MB after {args.sessions} "
+          f"({(rss[-1] - rss[1]) / max(args.sessions - 1, 1):+.2f} MB per later session)")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
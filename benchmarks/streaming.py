@@ -0,0 +1,85 @@
+"""Peak memory of reading one team's matches: whole-file parse vs streaming.
+
+"full" parses every CSV with ``read_raw`` and then keeps the team's matches,
+as a one-team view of a large archive would with the regular loader;
+"stream" uses ``read_filtered``, which filters each chunk while reading and
+skips the columns ``preprocess`` does not use. Each variant runs in a fresh
+process and reports that process's peak RSS, next to an "idle" process that
+only imports the pipeline. Run from the repository root:
+
+    python -m benchmarks.streaming [--scale 20] [--team Argentina] [--json PATH]
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from benchmarks.synthetic import write_scaled_dataset
+from pipeline import (DATA_DIR, PREPROCESS_COLUMNS, SHOOTOUT_KEYS, involves,
+                      read_filtered, read_raw)
+
+
+def _peak_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _run(variant, data_dir, team):
+    start = time.perf_counter()
+    if variant == "full":
+        results, goals, shootouts = read_raw(data_dir)
+        results = results[involves(results, [team])]
+        goals   = goals[pd.MultiIndex.from_frame(goals[SHOOTOUT_KEYS]).isin(
+            pd.MultiIndex.from_frame(results[SHOOTOUT_KEYS]))]
+        rows    = len(results) + len(goals)
+    elif variant == "stream":
+        results, goals, shootouts = read_filtered(data_dir, teams=[team],
+                                                  columns=PREPROCESS_COLUMNS)
+        rows = len(results) + len(goals)
+    else:
+        rows = 0
+    return {"seconds": round(time.perf_counter() - start, 3), "rows": rows,
+            "peak_mb": round(_peak_mb(), 1)}
+
+
+def measure(variant, data_dir, team):
+    """``_run`` in a fresh process, so peak RSS is that variant's alone."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_run, variant, data_dir, team).result()
+
+
+def report(data_dir, team):
+    result = {variant: measure(variant, data_dir, team) for variant in ("idle", "full", "stream")}
+    idle = result["idle"]["peak_mb"]
+    print(f"{'variant':<8} {'seconds':>8} {'rows kept':>10} {'peak MB':>8} {'above idle':>11}")
+    for variant, row in result.items():
+        print(f"{variant:<8} {row['seconds']:>8.2f} {row['rows']:>10,} "
+              f"{row['peak_mb']:>8.1f} {row['peak_mb'] - idle:>11.1f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=20,
+                        help="measure synthetic data scaled this many times")
+    parser.add_argument("--team", default="Argentina")
+    parser.add_argument("--json", help="also write the report to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = DATA_DIR if args.scale == 1 else write_scaled_dataset(args.scale, tmp, DATA_DIR)
+        result = report(data_dir, args.team)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
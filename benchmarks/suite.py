@@ -0,0 +1,231 @@
+"""Headless benchmark suite for the data pipeline and every chart builder.
+
+Times loading, filtering, the KPI query, each chart's data preparation,
+each full figure build (bypassing the figure cache) and its JSON
+serialization at the real data size and on synthetic
+``results.csv``/``goalscorers.csv`` scaled 10x and 100x, and records the
+size of every figure's JSON payload. Results are written as JSON so runs
+from different commits can be compared:
+
+    python -m benchmarks.suite [--scales 1 10 100] [--output PATH]
+    python -m benchmarks.suite --compare OLD.json NEW.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+import charts
+import forecast
+from cube import AggregateCube
+from elo import rate
+from benchmarks.synthetic import write_scaled_dataset
+from filters import filter_matches
+from form import form_columns, longest_runs
+from h2h import HeadToHead
+from pipeline import DATA_DIR, Dataset, read_raw
+from scorers import ScorerIndex
+from timing import TimingIndex
+
+RESULTS_DIR  = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_TEAM = "Argentina"
+YEAR_RANGE   = (1950, 2025)
+
+# (stage name, function of (ds, team)) for every chart's data preparation
+# and its figure build; figure builders are unwrapped from the cache.
+CHART_STAGES = [
+    ("waterfall",   lambda ds, t: charts.waterfall_data(ds, t),
+                    lambda ds, t: charts.waterfall.__wrapped__(ds, team=t)),
+    ("pyramid",     lambda ds, t: charts.pyramid_data(ds, t),
+                    lambda ds, t: charts.pyramid.__wrapped__(ds, team=t)),
+    ("radar",       lambda ds, t: charts.radar_data(ds, t, YEAR_RANGE, charts.MAJOR_TOURNAMENTS),
+                    lambda ds, t: charts.radar.__wrapped__(
+                        ds, team=t, year_range=YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS)),
+    ("elo",         lambda ds, t: charts.elo_data(ds, t, YEAR_RANGE),
+                    lambda ds, t: charts.elo_history.__wrapped__(ds, team=t, year_range=YEAR_RANGE)),
+    ("form",        lambda ds, t: charts.form_data(ds, t, YEAR_RANGE),
+                    lambda ds, t: charts.form_history.__wrapped__(ds, team=t, year_range=YEAR_RANGE)),
+    ("box",         lambda ds, t: charts.box_data(ds, t, YEAR_RANGE, charts.MAJOR_TOURNAMENTS),
+                    lambda ds, t: charts.box.__wrapped__(
+                        ds, team=t, year_range=YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS)),
+    ("top_scorers", lambda ds, t: charts.scorers_data(ds, t, YEAR_RANGE),
+                    lambda ds, t: charts.top_scorers.__wrapped__(ds, team=t, year_range=YEAR_RANGE)),
+    ("scatter_3d",  lambda ds, t: charts.scatter_3d_data(ds, t, YEAR_RANGE, charts.MAJOR_TOURNAMENTS),
+                    lambda ds, t: charts.scatter_3d.__wrapped__(
+                        ds, team=t, year_range=YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS)),
+    ("rivals",      lambda ds, t: charts.rivals_data(ds, t, YEAR_RANGE, charts.MAJOR_TOURNAMENTS),
+                    lambda ds, t: charts.rivals.__wrapped__(
+                        ds, team=t, year_range=YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS)),
+    ("rivalry_map", lambda ds, t: charts.rivalry_matrix_data(ds, YEAR_RANGE, charts.MAJOR_TOURNAMENTS),
+                    lambda ds, t: charts.rivalry_heatmap.__wrapped__(
+                        ds, year_range=YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS)),
+    ("shootouts",   lambda ds, t: charts.shootouts_data(ds, t),
+                    lambda ds, t: charts.shootout_pie.__wrapped__(ds, team=t)),
+    ("goal_timing", lambda ds, t: charts.timing_data(ds, t, YEAR_RANGE, charts.MAJOR_TOURNAMENTS),
+                    lambda ds, t: charts.goal_timing.__wrapped__(
+                        ds, team=t, year_range=YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS)),
+    ("late_goals",  lambda ds, t: charts.late_data(ds, t, YEAR_RANGE, charts.MAJOR_TOURNAMENTS),
+                    lambda ds, t: charts.late_goals.__wrapped__(
+                        ds, team=t, year_range=YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS)),
+    ("penalties",   lambda ds, t: charts.penalty_data(ds, t, YEAR_RANGE, charts.MAJOR_TOURNAMENTS),
+                    lambda ds, t: charts.penalty_share.__wrapped__(
+                        ds, team=t, year_range=YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS)),
+]
+
+
+def measure(fn, repeat):
+    """Run ``fn`` ``repeat`` times; return min/median wall time in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e3)
+    return {"min_ms": round(min(timings), 3),
+            "median_ms": round(statistics.median(timings), 3),
+            "repeat": repeat}
+
+
+def run_scale(data_dir, team, repeat, load_repeat):
+    """Every stage for one data directory, as ``{stage: timing}``."""
+    timings = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        timings["load_uncached"] = measure(
+            lambda: Dataset.load(data_dir, cache_dir=None), load_repeat)
+        Dataset.load(data_dir, cache_dir=cache_dir)                  # populate the cache
+        timings["load_cached"] = measure(
+            lambda: Dataset.load(data_dir, cache_dir=cache_dir), load_repeat)
+        ds = Dataset.load(data_dir, cache_dir=cache_dir)
+
+    team_rows = ds.matches(team)
+    timings["team_slice"] = measure(lambda: ds.matches(team), repeat)
+    timings["filter"] = measure(
+        lambda: filter_matches(team_rows, YEAR_RANGE, charts.MAJOR_TOURNAMENTS), repeat)
+
+    timings["cube_team_build"] = measure(
+        lambda: AggregateCube(ds.cube.cells).team(team), repeat)
+    team_cube = ds.cube.team(team)
+    timings["kpi"] = measure(
+        lambda: team_cube.totals(*YEAR_RANGE, tournaments=charts.MAJOR_TOURNAMENTS), repeat)
+    timings["scorer_index_build"] = measure(
+        lambda: ScorerIndex(ds.scorers.cells).team(team), repeat)
+    timings["h2h_build"] = measure(lambda: HeadToHead(ds.h2h.cells), repeat)
+    timings["timing_index_build"] = measure(
+        lambda: TimingIndex(ds.timing.cells).team(team), repeat)
+    timings["form_all_teams"] = measure(lambda: form_columns(ds.tables["matches"]), repeat)
+    timings["streaks"] = measure(lambda: longest_runs(ds.tables["matches"], "unbeaten"), repeat)
+    raw = read_raw(data_dir)[0]
+    timings["elo_full"] = measure(lambda: rate(raw), load_repeat)
+    timings["forecast_fit"] = measure(lambda: forecast.fit(ds.tables["matches"]), load_repeat)
+    model = forecast.fit(ds.tables["matches"])
+    bracket = next(iter(forecast.BRACKETS.values()))
+    timings["forecast_100k"] = measure(
+        lambda: forecast.simulate(model, bracket, runs=100_000, seed=0), load_repeat)
+
+    payload = {}
+    for name, prepare, build in CHART_STAGES:
+        timings[f"{name}_data"]   = measure(lambda: prepare(ds, team), repeat)
+        timings[f"{name}_figure"] = measure(lambda: build(ds, team), repeat)
+        fig = build(ds, team)
+        timings[f"{name}_json"]   = measure(lambda: pio.to_json(fig, validate=False), repeat)
+        payload[name] = len(pio.to_json(fig, validate=False))
+
+    sizes = {name: len(table) for name, table in ds.tables.items()}
+    sizes["team_matches"] = len(team_rows)
+    return {"rows": sizes, "timings": timings, "payload_bytes": payload}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DATA_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args):
+    report = {
+        "meta": {
+            "commit":    git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "pandas":    pd.__version__,
+            "numpy":     np.__version__,
+            "machine":   platform.machine(),
+            "team":      args.team,
+        },
+        "scales": {},
+    }
+    for scale in args.scales:
+        print(f"── {scale}x " + "─" * 40, flush=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = DATA_DIR if scale == 1 else write_scaled_dataset(scale, tmp, DATA_DIR)
+            result = run_scale(data_dir, args.team, args.repeat,
+                               args.repeat if scale == 1 else 1)
+        report["scales"][f"{scale}x"] = result
+        for stage, timing in result["timings"].items():
+            print(f"  {stage:<22} {timing['min_ms']:>10.2f} ms")
+        for chart, size in result["payload_bytes"].items():
+            print(f"  {chart + ' payload':<22} {size / 1024:>10.1f} KB")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"wrote {output}")
+
+
+def compare(old_path, new_path, threshold):
+    """Print new/old ratios of ``min_ms``; exit 1 if any exceeds ``threshold``."""
+    with open(old_path) as fh:
+        old = json.load(fh)
+    with open(new_path) as fh:
+        new = json.load(fh)
+
+    regressions = 0
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    for scale, result in new["scales"].items():
+        before = old["scales"].get(scale, {}).get("timings", {})
+        for stage, timing in result["timings"].items():
+            if stage not in before:
+                continue
+            ratio = timing["min_ms"] / max(before[stage]["min_ms"], 1e-6)
+            flag  = "  REGRESSION" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"  {scale:>5} {stage:<22} {before[stage]['min_ms']:>10.2f} "
+                  f"{timing['min_ms']:>10.2f} ms {ratio:>6.2f}x{flag}")
+        sizes = old["scales"].get(scale, {}).get("payload_bytes", {})
+        for chart, size in result.get("payload_bytes", {}).items():
+            if chart in sizes:
+                print(f"  {scale:>5} {chart + ' payload':<22} {sizes[chart] / 1024:>10.1f} "
+                      f"{size / 1024:>10.1f} KB {size / max(sizes[chart], 1):>6.2f}x")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--team", default=DEFAULT_TEAM)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="JSON path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression by --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
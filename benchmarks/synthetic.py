@@ -0,0 +1,57 @@
+"""Synthetic, scaled-up copies of the match data for benchmarks."""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from pipeline import DATA_FILES, NAMES_FILE
+
+
+def scale_frame(frame, scale, score_columns=(), seed=0):
+    """Tile ``frame`` ``scale`` times, shifting each copy's dates by one day.
+
+    Team and tournament names are kept so per-team slices grow with
+    ``scale``; ``score_columns`` are redrawn around their original values so
+    copies are not identical.
+    """
+    if scale == 1:
+        return frame
+    rng  = np.random.default_rng(seed)
+    big  = pd.concat([frame] * scale, ignore_index=True)
+    copy = np.repeat(np.arange(scale), len(frame))
+    big["date"] = pd.to_datetime(big["date"]) + pd.to_timedelta(copy, unit="D")
+    for column in score_columns:
+        big[column] = rng.poisson(big[column].to_numpy() + 0.1)
+    return big.sort_values("date", kind="stable", ignore_index=True)
+
+
+def synthetic_results(results, scale, seed=0):
+    """``results`` scaled ``scale`` times with jittered scores."""
+    return scale_frame(results, scale, ("home_score", "away_score"), seed)
+
+
+def write_scaled_dataset(scale, out_dir, src_dir, seed=0):
+    """Write ``results.csv`` and ``goalscorers.csv`` scaled ``scale`` times.
+
+    Copies are appended one at a time so memory stays at one copy of the
+    source; the written files are therefore not globally date-sorted.
+    ``shootouts.csv`` and ``former_names.csv`` are copied unchanged.
+    Returns ``out_dir``.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    scores = {"results.csv": ("home_score", "away_score"), "goalscorers.csv": ()}
+    rng = np.random.default_rng(seed)
+    for name in DATA_FILES + (NAMES_FILE,):
+        src, dst = os.path.join(src_dir, name), os.path.join(out_dir, name)
+        if name not in scores:
+            shutil.copyfile(src, dst)
+            continue
+        frame = pd.read_csv(src, parse_dates=["date"])
+        for copy in range(scale):
+            chunk = frame.assign(date=frame["date"] + pd.Timedelta(days=copy))
+            for column in scores[name] if copy else ():
+                chunk[column] = rng.poisson(chunk[column].to_numpy() + 0.1)
+            chunk.to_csv(dst, mode="a" if copy else "w", header=not copy,
+                         index=False, date_format="%Y-%m-%d")
+    return out_dir
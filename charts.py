@@ -0,0 +1,842 @@
+"""Figure builders for the dashboard, memoized in a bounded LRU cache.
+
+Each builder is a pure function of a ``Dataset`` and a few hashable
+parameters (team, year range, tournament selection). ``memoized`` caches the
+built figure on the builder name, the dataset token and those parameters, so
+a rerun only rebuilds the charts whose inputs actually changed.
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import forecast
+from cube import IS_HOME_SIDES
+from filters import filter_matches, year_slice
+from form import FORM_WINDOW
+from timing import BUCKETS, LATE, UNKNOWN
+
+MAJOR_TOURNAMENTS = ["FIFA World Cup","Copa América",
+                     "FIFA World Cup qualification","Friendly"]
+
+# Waterfall call-outs, written for the Argentina narrative.
+WC_NOTES = {
+    "Argentina": {
+        1978: " Champions",
+        1986: " Champions",
+        2022: " Champions",
+        1958: "Worst campaign",
+        2018: "Group-stage exit",
+    },
+}
+
+ERAS = {
+    "Maradona Era (1979–1990)":  (1979, 1990),
+    "Post-Maradona (1991–2004)": (1991, 2004),
+    "Messi Early (2005–2014)":   (2005, 2014),
+    "Messi Peak (2015–2025)":    (2015, 2025),
+}
+
+
+# ── Figure cache ──────────────────────────────────────────────────────────────
+class FigureCache:
+    """Thread-safe LRU of built figures with hit/miss/eviction counters.
+
+    A key is built by one thread at a time: a lookup that finds the key
+    being built elsewhere (say, by the warm-up thread) waits for that build
+    instead of repeating it.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize   = maxsize
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._items    = OrderedDict()
+        self._building = {}
+        self._lock     = threading.Lock()
+
+    def get_or_build(self, key, build):
+        while True:
+            with self._lock:
+                if key in self._items:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return self._items[key]
+                pending = self._building.get(key)
+                if pending is None:
+                    self.misses += 1
+                    self._building[key] = done = threading.Event()
+                    break
+            pending.wait()   # then look again; build here if that build failed
+        try:
+            value = build()
+            with self._lock:
+                self._items[key] = value
+                self._items.move_to_end(key)
+                while len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+                    self.evictions += 1
+        finally:
+            with self._lock:
+                del self._building[key]
+            done.set()
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size":      len(self._items),
+                "maxsize":   self.maxsize,
+                "hits":      self.hits,
+                "misses":    self.misses,
+                "evictions": self.evictions,
+                "hit_rate":  self.hits / lookups if lookups else 0.0,
+            }
+
+
+FIGURES = FigureCache()
+
+
+def _freeze(value):
+    """Hashable, order-insensitive form of a list/set parameter."""
+    if isinstance(value, (list, set, frozenset)):
+        return tuple(sorted(value))
+    return value
+
+
+def memoized(builder):
+    """Cache ``builder(ds, **params)`` in ``FIGURES``.
+
+    The key is the builder name, ``ds.token`` and the frozen keyword
+    parameters; list arguments are treated as unordered selections.
+    """
+    @functools.wraps(builder)
+    def wrapper(ds, **params):
+        params = {name: _freeze(value) for name, value in params.items()}
+        key = (builder.__name__, ds.token, tuple(sorted(params.items())))
+        return FIGURES.get_or_build(key, lambda: builder(ds, **params))
+    return wrapper
+
+
+# ── Lean traces ───────────────────────────────────────────────────────────────
+# Every figure is serialized to JSON and sent to the browser on each rerun,
+# so point-heavy traces carry numbers (``customdata``) rather than per-point
+# strings, switch to WebGL past ``WEBGL_POINTS`` and are reduced past the
+# thresholds below before they are built.
+WEBGL_POINTS    = 1_000
+MAX_LINE_POINTS = 2_000   # min/max decimation for line charts
+BOX_SAMPLES     = 500     # boxes send precomputed quartiles beyond this
+
+
+def _scatter(n, **trace):
+    """``go.Scatter``, or ``go.Scattergl`` once ``n`` points would make SVG slow."""
+    return (go.Scattergl if n > WEBGL_POINTS else go.Scatter)(**trace)
+
+
+def _days(dates):
+    """Dates as ``YYYY-MM-DD`` strings, half the JSON of full timestamps."""
+    return np.datetime_as_string(np.asarray(dates, dtype="datetime64[D]"))
+
+
+def decimate(y, max_points=MAX_LINE_POINTS):
+    """Positions of ``y`` to keep so a line keeps its shape in ``max_points``.
+
+    Splits the series into ``max_points // 2`` buckets and keeps each
+    bucket's minimum and maximum (plus both ends), in order.
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max_points // 2
+    bucket  = np.arange(n) * buckets // n
+    order   = np.lexsort((y, bucket))
+    bounds  = np.searchsorted(bucket[order], np.arange(buckets + 1))
+    return np.unique(np.r_[0, order[bounds[:-1]], order[bounds[1:] - 1], n - 1])
+
+
+def box_stats(values):
+    """Plotly's box statistics for ``values``: quartiles, fences and outliers.
+
+    Quartiles use the Hazen positions (n·p − 0.5) that Plotly's default
+    ``linear`` quartile method uses, so a precomputed box draws the same.
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    q1, median, q3 = np.percentile(values, [25, 50, 75], method="hazen")
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    return {"q1": q1, "median": median, "q3": q3,
+            "lowerfence": min(q1, inside[0]), "upperfence": max(q3, inside[-1]),
+            "outliers": np.unique(values[(values < low) | (values > high)])}
+
+
+def _lean_boxes(fig):
+    """Slim the single-category box traces ``px.box`` builds.
+
+    The category goes in ``x0`` instead of being repeated for every sample,
+    and traces with over ``BOX_SAMPLES`` samples are swapped for their
+    statistics, with one outlier marker per distinct value.
+    """
+    for trace in list(fig.data):
+        if trace.type != "box" or trace.y is None or len(set(trace.x)) != 1:
+            continue
+        label = trace.x[0]
+        if len(trace.y) <= BOX_SAMPLES:
+            trace.update(x=None, x0=label)
+            continue
+        stats = box_stats(trace.y)
+        trace.update(x=[label], y=None, boxpoints=False,
+                     **{k: [v] for k, v in stats.items() if k != "outliers"})
+        fig.add_trace(go.Scatter(
+            x=[label] * len(stats["outliers"]), y=stats["outliers"], mode="markers",
+            marker_color=trace.marker.color, showlegend=False,
+            xaxis=trace.xaxis, yaxis=trace.yaxis, hoverinfo="y",
+        ))
+    return fig
+
+
+# ── Section 1 — Overall Performance ───────────────────────────────────────────
+def waterfall_data(ds, team):
+    """World Cup goals for/against and difference per edition."""
+    wc_yr = ds.cube.team(team).by_year(tournaments=["FIFA World Cup"])
+    wc_yr["gd"] = wc_yr["scored"] - wc_yr["conceded"]
+    return wc_yr[["year", "scored", "conceded", "gd"]]
+
+
+@memoized
+def waterfall(ds, team):
+    wc_yr = waterfall_data(ds, team)
+    annotations_map = WC_NOTES.get(team, {})
+
+    fig_wf = go.Figure(go.Waterfall(
+        x=wc_yr["year"].astype(str).tolist(),
+        y=wc_yr["gd"].tolist(),
+        measure=["relative"] * len(wc_yr),
+        text=[f"{'+' if g>0 else ''}{g}" for g in wc_yr["gd"]],
+        textposition="outside",
+        connector={"line": {"color":"#555","dash":"dot"}},
+        increasing={"marker": {"color":"#75AADB"}},
+        decreasing={"marker": {"color":"#D6001C"}},
+    ))
+
+    for _, row in wc_yr.iterrows():
+        if row["year"] in annotations_map:
+            offset = 1.3 if row["gd"] >= 0 else -2.0
+            fig_wf.add_annotation(
+                x=str(row["year"]),
+                y=row["gd"] + offset,
+                text=annotations_map[row["year"]],
+                showarrow=False,
+                font=dict(size=10, color="#F6BE00"),
+            )
+
+    fig_wf.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=420,
+        yaxis_title="Goal Difference", xaxis_title="World Cup Year",
+        showlegend=False,
+    )
+    return fig_wf
+
+
+def pyramid_data(ds, team):
+    """Goals scored per decade, split by listed home/away side."""
+    team_cube  = ds.cube.team(team)
+    home_goals = team_cube.by_decade(sides=IS_HOME_SIDES[True])
+    away_goals = team_cube.by_decade(sides=IS_HOME_SIDES[False])
+    return home_goals[["decade"]].assign(home=home_goals["scored"],
+                                         away=away_goals["scored"])
+
+
+@memoized
+def pyramid(ds, team):
+    goals       = pyramid_data(ds, team)
+    all_decades = goals["decade"].tolist()
+
+    home_vals = goals["home"].tolist()
+    away_vals = goals["away"].tolist()
+    max_val   = max(max(home_vals), max(away_vals)) + 20
+
+    fig_pyr = go.Figure()
+    fig_pyr.add_trace(go.Bar(
+        y=all_decades, x=[-v for v in home_vals],
+        orientation="h", name="Home Goals",
+        marker_color="#75AADB",
+        text=[str(v) for v in home_vals],
+        textposition="inside", insidetextanchor="middle",
+    ))
+    fig_pyr.add_trace(go.Bar(
+        y=all_decades, x=away_vals,
+        orientation="h", name="Away Goals",
+        marker_color="#D6001C",
+        text=[str(v) for v in away_vals],
+        textposition="inside", insidetextanchor="middle",
+    ))
+
+    tick_vals = list(range(-max_val, max_val+1, 40))
+    tick_text = [str(abs(v)) for v in tick_vals]
+
+    fig_pyr.update_layout(
+        barmode="relative",
+        xaxis=dict(tickvals=tick_vals, ticktext=tick_text,
+                   title="Goals Scored", color="#cccccc", gridcolor="#333"),
+        yaxis=dict(title="Decade", color="#cccccc"),
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=430,
+        legend=dict(bgcolor="rgba(0,0,0,0)"),
+        bargap=0.15,
+    )
+    fig_pyr.add_vline(x=0, line_color="#666", line_width=1.5)
+    return fig_pyr
+
+
+RADAR_CATS = ["Win Rate %", "Avg Goals Scored", "Avg Goals Conceded (inv)",
+              "Clean Sheet %", "Draw Avoidance %"]
+
+
+def radar_data(ds, team, year_range, tournaments):
+    """Radar values per era with matches inside the filters, keyed by era name."""
+    team_cube = ds.cube.team(team)
+    eras = {}
+    for era_name, (y1, y2) in ERAS.items():
+        sub = team_cube.totals(max(y1, year_range[0]), min(y2, year_range[1]),
+                               tournaments=tournaments)
+        n = sub["matches"]
+        if n == 0:
+            continue
+        wr   = sub["wins"] / n * 100
+        asc  = sub["scored"] / n * 20
+        acc  = max((1 - sub["conceded"] / n / 4) * 100, 0)
+        cs   = sub["clean_sheets"] / n * 100
+        da   = (n - sub["draws"]) / n * 100
+        eras[era_name] = [wr, asc, acc, cs, da]
+    return eras
+
+
+@memoized
+def radar(ds, team, year_range, tournaments):
+    eras       = radar_data(ds, team, year_range, tournaments)
+    era_colors = dict(zip(ERAS, ["#75AADB","#F6BE00","#D6001C","#4CAF50"]))
+
+    fig_radar = go.Figure()
+    for era_name, values in eras.items():
+        color = era_colors[era_name]
+        vals  = values + [values[0]]   # close the polygon
+        cats  = RADAR_CATS + [RADAR_CATS[0]]
+
+        fig_radar.add_trace(go.Scatterpolar(
+            r=vals, theta=cats,
+            fill="toself", name=era_name,
+            line_color=color, fillcolor=color, opacity=0.25,
+        ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100],
+                            tickfont=dict(color="#aaaaaa"), gridcolor="#333"),
+            angularaxis=dict(tickfont=dict(color="#cccccc"), gridcolor="#444"),
+            bgcolor="rgba(0,0,0,0)",
+        ),
+        paper_bgcolor="rgba(0,0,0,0)", font_color="#cccccc",
+        legend=dict(bgcolor="rgba(0,0,0,0)"),
+        height=460, margin=dict(t=40, b=40),
+    )
+    return fig_radar
+
+
+def elo_data(ds, team, year_range):
+    """Elo rating after each match in ``year_range`` (all tournaments)."""
+    rows = year_slice(ds.matches(team), *year_range)
+    return pd.DataFrame({
+        "date":   rows["date"].to_numpy(),
+        "rating": (rows["elo"] + rows["elo_change"]).to_numpy(),
+    })
+
+
+@memoized
+def elo_history(ds, team, year_range):
+    elo = elo_data(ds, team, year_range)
+
+    keep = decimate(elo["rating"].to_numpy())
+    fig_elo = go.Figure(_scatter(
+        len(keep), x=_days(elo["date"].to_numpy()[keep]), y=elo["rating"].to_numpy()[keep],
+        mode="lines",
+        line=dict(color="#75AADB", width=1.8),
+        hovertemplate="%{x|%Y-%m-%d}<br>Elo: %{y:.0f}<extra></extra>",
+    ))
+    fig_elo.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=380,
+        xaxis=dict(gridcolor="#333"), yaxis=dict(title="Elo rating", gridcolor="#333"),
+        margin=dict(t=20, b=10),
+    )
+    return fig_elo
+
+
+def form_data(ds, team, year_range):
+    """Rolling points per game and goal difference after each match in ``year_range``."""
+    rows = year_slice(ds.matches(team), *year_range)
+    return pd.DataFrame({
+        "date": rows["date"].to_numpy(),
+        "ppg":  rows["form_ppg"].to_numpy(),
+        "gd":   rows["form_gd"].to_numpy(),
+    })
+
+
+@memoized
+def form_history(ds, team, year_range):
+    form = form_data(ds, team, year_range)
+
+    keep  = decimate(form["ppg"].to_numpy())
+    dates = _days(form["date"].to_numpy()[keep])
+    fig_form = go.Figure([
+        _scatter(len(keep), x=dates, y=form["ppg"].to_numpy()[keep], name="Points per game",
+                 mode="lines", line=dict(color="#75AADB", width=1.8),
+                 hovertemplate="%{x|%Y-%m-%d}<br>PPG: %{y:.2f}<extra></extra>"),
+        _scatter(len(keep), x=dates, y=form["gd"].to_numpy()[keep], name="Goal difference",
+                 mode="lines", line=dict(color="#F6BE00", width=1.2), yaxis="y2",
+                 hovertemplate="%{x|%Y-%m-%d}<br>GD: %{y:+d}<extra></extra>"),
+    ])
+    fig_form.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=380,
+        xaxis=dict(gridcolor="#333"),
+        yaxis=dict(title=f"Points per game (last {FORM_WINDOW})", range=[0, 3.05],
+                   gridcolor="#333"),
+        yaxis2=dict(title=f"Goal difference (last {FORM_WINDOW})", overlaying="y",
+                    side="right", showgrid=False),
+        legend=dict(bgcolor="rgba(0,0,0,0)", orientation="h", y=1.1),
+        margin=dict(t=20, b=10),
+    )
+    return fig_form
+
+
+def streak_table(ds, run, team, top=10):
+    """The ``top`` longest ``run`` streaks of any team, plus ``team``'s best if not among them."""
+    board = ds.streaks(run)
+    board = board.assign(Rank=np.arange(1, len(board) + 1))
+    rows  = board.iloc[:top]
+    mine  = board[(board["team"] == team).to_numpy()]
+    if len(mine) and mine["Rank"].iloc[0] > top:
+        rows = pd.concat([rows, mine])
+    return pd.DataFrame({
+        "Rank":    rows["Rank"].to_numpy(),
+        "Team":    rows["team"].astype(str).to_numpy(),
+        "Matches": rows["matches"].to_numpy(),
+        "From":    _days(rows["start"].to_numpy()),
+        "To":      _days(rows["end"].to_numpy()),
+    })
+
+
+# ── Section 2 — Goals & Scorers ───────────────────────────────────────────────
+SHORT_NAMES = {
+    "FIFA World Cup":               "World Cup",
+    "Copa América":                 "Copa América",
+    "FIFA World Cup qualification": "WC Qual.",
+    "Friendly":                     "Friendly",
+}
+
+
+def box_data(ds, team, year_range, tournaments):
+    """Filtered major-tournament matches with a short tournament label."""
+    df = filter_matches(ds.matches(team), year_range, tournaments)
+    data = df[df["tournament"].isin(MAJOR_TOURNAMENTS)]
+    return data.assign(Short=data["tournament"].map(SHORT_NAMES))
+
+
+@memoized
+def box(ds, team, year_range, tournaments):
+    data = box_data(ds, team, year_range, tournaments)
+
+    fig_box = px.box(
+        data, x="Short", y="scored",
+        color="Short",
+        color_discrete_sequence=["#75AADB","#F6BE00","#D6001C","#4CAF50"],
+        points="outliers",
+        labels={"scored":"Goals Scored","Short":"Tournament"},
+        height=430,
+    )
+    fig_box.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", showlegend=False,
+    )
+    return _lean_boxes(fig_box)
+
+
+def scorers_data(ds, team, year_range=None):
+    """Top 15 scorers in ``year_range`` (own goals excluded), fewest goals first."""
+    first, last = year_range or (None, None)
+    return ds.scorers.team(team).top(15, first, last).sort_values("Goals")
+
+
+@memoized
+def top_scorers(ds, team, year_range=None):
+    top_scorers = scorers_data(ds, team, year_range)
+
+    leader     = top_scorers["Scorer"].iloc[-1] if len(top_scorers) else None
+    colors_bar = ["#D6001C" if s == leader else "#75AADB"
+                  for s in top_scorers["Scorer"]]
+
+    fig_bar = go.Figure(go.Bar(
+        x=top_scorers["Goals"], y=top_scorers["Scorer"],
+        orientation="h",
+        marker_color=colors_bar,
+        text=top_scorers["Goals"], textposition="outside",
+    ))
+    fig_bar.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=430,
+        xaxis_title="Goals", yaxis_title="",
+    )
+    return fig_bar
+
+
+def scatter_3d_data(ds, team, year_range, tournaments):
+    """Per (year, major tournament) averages for editions with 2+ matches."""
+    df      = filter_matches(ds.matches(team), year_range, tournaments)
+    df_3d   = df[df["tournament"].isin(MAJOR_TOURNAMENTS)]
+    df_3d   = df_3d.assign(win=(df_3d["result"] == "Win").to_numpy())
+    df_3d_g = (df_3d.groupby(["year","tournament"], observed=True)
+                    .agg(avg_scored=("scored","mean"),
+                         avg_conceded=("conceded","mean"),
+                         matches=("result","count"),
+                         win_rate=("win","mean"))
+                    .reset_index())
+    df_3d_g["win_rate"] *= 100
+    return df_3d_g[df_3d_g["matches"] >= 2]
+
+
+@memoized
+def scatter_3d(ds, team, year_range, tournaments):
+    df_3d_g = scatter_3d_data(ds, team, year_range, tournaments)
+
+    color_map_3d = {
+        "FIFA World Cup":               "#F6BE00",
+        "Copa América":                 "#75AADB",
+        "FIFA World Cup qualification": "#D6001C",
+        "Friendly":                     "#4CAF50",
+    }
+
+    fig_3d = go.Figure()
+    for tourn, color in color_map_3d.items():
+        sub = df_3d_g[df_3d_g["tournament"] == tourn]
+        if sub.empty:
+            continue
+        fig_3d.add_trace(go.Scatter3d(
+            x=sub["year"],
+            y=sub["avg_scored"],
+            z=sub["avg_conceded"],
+            mode="markers",
+            name=tourn,
+            marker=dict(
+                size=sub["win_rate"] / 8 + 3,
+                color=color, opacity=0.82,
+                line=dict(width=0.5, color="#222"),
+            ),
+            customdata=sub["win_rate"],
+            hovertemplate=(f"{tourn}<br>Year: %{{x}}<br>"
+                           "Avg Scored: %{y:.2f}<br>"
+                           "Avg Conceded: %{z:.2f}<br>"
+                           "Win Rate: %{customdata:.0f}%<extra></extra>"),
+        ))
+
+    fig_3d.update_layout(
+        scene=dict(
+            xaxis=dict(title="Year", backgroundcolor="rgba(0,0,0,0)",
+                       gridcolor="#333", color="#ccc"),
+            yaxis=dict(title="Avg Goals Scored", backgroundcolor="rgba(0,0,0,0)",
+                       gridcolor="#333", color="#ccc"),
+            zaxis=dict(title="Avg Goals Conceded", backgroundcolor="rgba(0,0,0,0)",
+                       gridcolor="#333", color="#ccc"),
+            bgcolor="rgba(0,0,0,0)",
+        ),
+        paper_bgcolor="rgba(0,0,0,0)", font_color="#cccccc",
+        height=520, legend=dict(bgcolor="rgba(0,0,0,0)"),
+        margin=dict(t=20, b=10),
+    )
+    return fig_3d
+
+
+# ── Section 3 — Tournaments & Rivals ──────────────────────────────────────────
+def rivals_data(ds, team, year_range, tournaments):
+    """Win/draw/loss record against the ten most-played filtered opponents."""
+    top = ds.h2h.top(team, 10, year_range, tournaments).sort_values("opponent")
+    rival_stats = pd.DataFrame({
+        "opponent": top["opponent"].to_numpy(),
+        "Draw":     top["draws"].to_numpy(),
+        "Loss":     top["losses"].to_numpy(),
+        "Win":      top["wins"].to_numpy(),
+    })
+    rival_stats["Total"]    = rival_stats["Win"] + rival_stats["Draw"] + rival_stats["Loss"]
+    rival_stats["Win Rate"] = rival_stats["Win"] / rival_stats["Total"] * 100
+    return rival_stats
+
+
+@memoized
+def rivals(ds, team, year_range, tournaments):
+    rival_stats = rivals_data(ds, team, year_range, tournaments)
+
+    fig_scatter = px.scatter(
+        rival_stats, x="Total", y="Win Rate",
+        size="Win", color="Win Rate",
+        color_continuous_scale=["#D6001C","#F6BE00","#75AADB"],
+        text="opponent", height=460,
+        labels={"Total":"Matches Played","Win Rate":"Win Rate (%)","Win":"Wins"},
+    )
+    fig_scatter.update_traces(textposition="top center", textfont_color="#ffffff")
+    fig_scatter.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", coloraxis_showscale=False,
+    )
+    return fig_scatter
+
+
+def rivalry_matrix_data(ds, year_range, tournaments, size=20):
+    """Row team's win rate (%) against column team among the ``size`` busiest teams.
+
+    Returns ``(teams, win_rate, played)``; pairs that never met are NaN.
+    """
+    teams, pairs = ds.h2h.matrix(year_range, tournaments, size)
+    played   = pairs[:, :, 0]
+    win_rate = np.divide(pairs[:, :, 1] * 100, played,
+                         out=np.full(played.shape, np.nan), where=played > 0)
+    return teams, win_rate, played
+
+
+@memoized
+def rivalry_heatmap(ds, year_range, tournaments):
+    teams, win_rate, played = rivalry_matrix_data(ds, year_range, tournaments)
+
+    fig_heat = go.Figure(go.Heatmap(
+        z=win_rate, x=teams, y=teams, customdata=played,
+        colorscale=["#D6001C","#F6BE00","#75AADB"], zmin=0, zmax=100,
+        colorbar=dict(title="Win %"),
+        hovertemplate="%{y} vs %{x}<br>Win rate: %{z:.0f}%<br>"
+                      "Matches: %{customdata}<extra></extra>",
+    ))
+    fig_heat.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=620,
+        xaxis=dict(tickangle=-45), yaxis=dict(autorange="reversed"),
+        margin=dict(t=20, b=10),
+    )
+    return fig_heat
+
+
+def shootouts_data(ds, team):
+    """Shootouts won and lost."""
+    won = ds.shootouts(team)["shootout_won"].to_numpy()
+    return int(won.sum()), int((~won).sum())
+
+
+def shootout_table(ds, team):
+    """One Year/Opponent/Outcome row per shootout, most recent first."""
+    shoots = ds.shootouts(team).iloc[::-1]      # team rows are in date order
+    return pd.DataFrame({
+        "Year":     shoots["year"].to_numpy(),
+        "Opponent": shoots["opponent"].to_numpy(),
+        "Outcome":  np.where(shoots["shootout_won"].to_numpy(), " Won", " Lost"),
+    })
+
+
+@memoized
+def shootout_pie(ds, team):
+    won_s, lost_s = shootouts_data(ds, team)
+
+    fig_shoot = go.Figure(go.Pie(
+        labels=["Won","Lost"],
+        values=[won_s, lost_s],
+        hole=0.52,
+        marker_colors=["#75AADB","#D6001C"],
+        textinfo="label+percent",
+    ))
+    fig_shoot.add_annotation(
+        text=f"{won_s}W – {lost_s}L",
+        x=0.5, y=0.5,
+        font_size=17, showarrow=False, font_color="#ffffff",
+    )
+    fig_shoot.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=320,
+        showlegend=False,
+    )
+    return fig_shoot
+
+
+# ── Section 4 — Forecast ──────────────────────────────────────────────────────
+@functools.lru_cache(maxsize=2)
+def poisson_model(ds):
+    """The Poisson scoring model fitted to ``ds`` (once per dataset)."""
+    return forecast.fit(ds.tables["matches"])
+
+
+def brackets(ds):
+    """Names of the forecast brackets whose teams all have their record in ``ds``."""
+    teams = set(ds.teams())
+    return [name for name, bracket in forecast.BRACKETS.items() if teams.issuperset(bracket)]
+
+
+@memoized
+def title_odds(ds, bracket, runs, seed):
+    """Round-by-round probabilities for the named bracket, title favourites first."""
+    odds = forecast.simulate(poisson_model(ds), forecast.BRACKETS[bracket], runs, seed)
+    return odds.sort_values("Champion", ascending=False)
+
+
+@memoized
+def forecast_chart(ds, bracket, runs, seed, team):
+    odds = title_odds(ds, bracket=bracket, runs=runs, seed=seed).iloc[::-1]
+
+    fig_fc = go.Figure(go.Bar(
+        x=odds["Champion"] * 100, y=odds.index,
+        orientation="h",
+        marker_color=["#D6001C" if t == team else "#75AADB" for t in odds.index],
+        text=[f"{p:.1%}" for p in odds["Champion"]], textposition="outside",
+        hovertemplate="%{y}: %{x:.1f}%<extra></extra>",
+    ))
+    fig_fc.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=max(320, 34 * len(odds)),
+        xaxis_title="Title probability (%)", yaxis_title="",
+    )
+    return fig_fc
+
+
+# ── Section 5 — Goal Timing ───────────────────────────────────────────────────
+def timing_data(ds, team, year_range, tournaments):
+    """Goals scored and conceded per minute bucket in the filters.
+
+    One row per ``timing.BUCKETS`` entry (the last is goals without a
+    minute) with totals, penalties and own goals for each side.
+    """
+    hist = ds.timing.team(team).histogram(*year_range, tournaments=tournaments)
+    return pd.DataFrame({
+        "bucket":             BUCKETS,
+        "scored":             hist[0].sum(axis=1),
+        "conceded":           hist[1].sum(axis=1),
+        "scored_penalties":   hist[0, :, 1],
+        "conceded_penalties": hist[1, :, 1],
+        "scored_own_goals":   hist[0, :, 2],
+    })
+
+
+def _eras_within(year_range):
+    """``ERAS`` year spans clipped to ``year_range`` (empty spans stay empty)."""
+    return [(max(y1, year_range[0]), min(y2, year_range[1])) for y1, y2 in ERAS.values()]
+
+
+def late_data(ds, team, year_range, tournaments):
+    """Per era, the share (%) of goals with a known minute that came from the 76th on."""
+    counts = ds.timing.team(team).by_period(_eras_within(year_range), tournaments).sum(axis=3)
+    known  = counts[:, :, :UNKNOWN].sum(axis=2)
+    late   = counts[:, :, LATE].sum(axis=2)
+    rate   = np.divide(late * 100, known, out=np.full(known.shape, np.nan), where=known > 0)
+    frame  = pd.DataFrame({
+        "era":            list(ERAS),
+        "scored":         rate[:, 0],
+        "conceded":       rate[:, 1],
+        "scored_goals":   known[:, 0],
+        "conceded_goals": known[:, 1],
+    })
+    return frame[(known > 0).any(axis=1)].reset_index(drop=True)
+
+
+def penalty_data(ds, team, year_range, tournaments):
+    """Penalty share (%) of goals scored per selected tournament and era.
+
+    Returns ``(rows, eras, share, goals)`` with one row per selected
+    tournament the team has scored in plus a total row; cells without goals
+    are NaN.
+    """
+    timing = ds.timing.team(team)
+    keep   = np.isin(timing.tournaments, np.asarray(list(tournaments), dtype=str))
+    kinds  = np.stack([timing.by_tournament(first, last)[keep, 0].sum(axis=1)
+                       for first, last in _eras_within(year_range)], axis=1)   # (row, era, kind)
+    kinds  = np.concatenate([kinds, kinds.sum(axis=0, keepdims=True)])
+    goals  = kinds.sum(axis=2)
+    share  = np.divide(kinds[..., 1] * 100, goals, out=np.full(goals.shape, np.nan),
+                       where=goals > 0)
+    return timing.tournaments[keep].tolist() + ["All selected"], list(ERAS), share, goals
+
+
+@memoized
+def goal_timing(ds, team, year_range, tournaments):
+    data  = timing_data(ds, team, year_range, tournaments)
+    known = data.iloc[:UNKNOWN]
+
+    fig_time = go.Figure()
+    for side, color in (("scored", "#75AADB"), ("conceded", "#D6001C")):
+        total = max(int(known[side].sum()), 1)
+        fig_time.add_trace(go.Bar(
+            x=known["bucket"], y=known[side], name=side.capitalize(), marker_color=color,
+            customdata=np.column_stack([known[side] / total * 100,
+                                        known[f"{side}_penalties"]]),
+            hovertemplate="%{x}: %{y} goals (%{customdata[0]:.1f}%)<br>"
+                          "Penalties: %{customdata[1]}<extra>" + side.capitalize() + "</extra>",
+        ))
+    unknown = data.iloc[UNKNOWN]
+    if unknown["scored"] or unknown["conceded"]:
+        fig_time.add_annotation(
+            text=f"Minute unknown: {unknown['scored']} scored, {unknown['conceded']} conceded",
+            xref="paper", yref="paper", x=1, y=1.08, showarrow=False, font_color="#aaaaaa")
+    fig_time.update_layout(
+        barmode="group",
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=420,
+        xaxis_title="Minute", yaxis_title="Goals",
+        legend=dict(bgcolor="rgba(0,0,0,0)"),
+    )
+    return fig_time
+
+
+@memoized
+def late_goals(ds, team, year_range, tournaments):
+    data = late_data(ds, team, year_range, tournaments)
+
+    fig_late = go.Figure()
+    for side, color in (("scored", "#75AADB"), ("conceded", "#D6001C")):
+        fig_late.add_trace(go.Bar(
+            x=data["era"], y=data[side], name=side.capitalize(), marker_color=color,
+            customdata=data[f"{side}_goals"],
+            hovertemplate="%{x}<br>%{y:.1f}% of %{customdata} goals<extra>"
+                          + side.capitalize() + "</extra>",
+        ))
+    fig_late.update_layout(
+        barmode="group",
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=400,
+        yaxis_title="Goals from 76' on (%)", xaxis_title="",
+        legend=dict(bgcolor="rgba(0,0,0,0)"),
+    )
+    return fig_late
+
+
+@memoized
+def penalty_share(ds, team, year_range, tournaments):
+    rows, eras, share, goals = penalty_data(ds, team, year_range, tournaments)
+
+    fig_pen = go.Figure(go.Heatmap(
+        z=share, x=eras, y=rows, customdata=goals,
+        colorscale=["#1e2530", "#75AADB", "#F6BE00"], zmin=0,
+        colorbar=dict(title="Penalty %"),
+        text=np.where(np.isnan(share), "", np.char.mod("%.0f%%", np.nan_to_num(share))),
+        texttemplate="%{text}",
+        hovertemplate="%{y} · %{x}<br>Penalties: %{z:.1f}% of %{customdata} goals"
+                      "<extra></extra>",
+    ))
+    fig_pen.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#cccccc", height=max(260, 60 * len(rows) + 120),
+        yaxis=dict(autorange="reversed"), margin=dict(t=20, b=10),
+    )
+    return fig_pen
@@ -0,0 +1,116 @@
+"""Year-by-tournament aggregate cube behind the KPI cards and tab 1 charts.
+
+``cube_cells`` reduces the long match table to one row per
+(team, tournament, side, year) with counts and sums; it is small enough to
+cache with the other tables. ``AggregateCube`` expands a team's cells into a
+dense array with cumulative sums along the year axis, so any year range is
+two binary searches and a subtraction, and any tournament/side selection a
+sum over a handful of slots.
+"""
+import numpy as np
+import pandas as pd
+
+MEASURES = ("matches", "wins", "draws", "losses", "scored", "conceded", "clean_sheets")
+
+# Neutral matches keep the listed home/away side so the pyramid's is_home
+# split can be answered from the same cells as the neutral/non-neutral one.
+SIDES = ("home", "away", "neutral_home", "neutral_away")
+IS_HOME_SIDES = {True: [0, 2], False: [1, 3]}
+
+
+def year_range(years, first, last):
+    """Prefix rows ``lo, hi`` spanning years ``first..last`` (inclusive) of ``years``."""
+    lo = 0 if first is None else np.searchsorted(years, first, side="left")
+    hi = len(years) if last is None else np.searchsorted(years, last, side="right")
+    return lo, max(hi, lo)
+
+
+def cube_cells(matches):
+    """One row per (team, tournament, side, year) with every measure in ``MEASURES``."""
+    side = (np.where(matches["neutral"].to_numpy(), 2, 0) +
+            (~matches["is_home"].to_numpy()).astype(int))
+    result = matches["result"].array
+    frame = pd.DataFrame({
+        "team":         matches.index,
+        "tournament":   matches["tournament"].array,
+        "side":         side.astype(np.int8),
+        "year":         matches["year"].to_numpy(),
+        "matches":      1,
+        "wins":         result == "Win",
+        "draws":        result == "Draw",
+        "losses":       result == "Loss",
+        "scored":       matches["scored"].to_numpy(),
+        "conceded":     matches["conceded"].to_numpy(),
+        "clean_sheets": matches["conceded"].to_numpy() == 0,
+    })
+    keys  = ["team", "tournament", "side", "year"]
+    cells = frame.groupby(keys, observed=True, sort=True)[list(MEASURES)].sum()
+    return cells.astype(np.int32).reset_index(level=["tournament", "side", "year"])
+
+
+class TeamCube:
+    """Prefix-summed (year, tournament, side, measure) array for one team."""
+
+    def __init__(self, cells):
+        self.years, year_idx = np.unique(cells["year"].to_numpy(), return_inverse=True)
+        self.tournaments, tourn_idx = np.unique(cells["tournament"].astype(str).to_numpy(),
+                                                return_inverse=True)
+        dense = np.zeros((len(self.years) + 1, len(self.tournaments), len(SIDES),
+                          len(MEASURES)), dtype=np.int32)
+        dense[year_idx + 1, tourn_idx, cells["side"].to_numpy()] = \
+            cells[list(MEASURES)].to_numpy()
+        self.prefix = dense.cumsum(axis=0, dtype=np.int32)
+
+    def _select(self, window, tournaments, sides):
+        """Sum ``window`` (..., tournament, side, measure) over the selection."""
+        if tournaments is not None:
+            keep = np.isin(self.tournaments, np.asarray(list(tournaments), dtype=str))
+            window = window[..., keep, :, :]
+        if sides is not None:
+            window = window[..., sides, :]
+        return window.sum(axis=(-3, -2))
+
+    def totals(self, first=None, last=None, tournaments=None, sides=None):
+        """Measures summed over years ``first..last`` (inclusive) and the selection."""
+        lo, hi = year_range(self.years, first, last)
+        window = self.prefix[hi] - self.prefix[lo]
+        return dict(zip(MEASURES, self._select(window, tournaments, sides).tolist()))
+
+    def by_year(self, tournaments=None, sides=None):
+        """Per-year measures for the selection, keeping only years with matches."""
+        per_year = self._select(np.diff(self.prefix, axis=0), tournaments, sides)
+        frame = pd.DataFrame(per_year, columns=list(MEASURES))
+        frame.insert(0, "year", self.years)
+        return frame[frame["matches"] > 0].reset_index(drop=True)
+
+    def by_decade(self, tournaments=None, sides=None):
+        """Per-decade measures for every decade in which the team played."""
+        decades = self.years // 10 * 10
+        starts  = np.flatnonzero(np.r_[True, decades[1:] != decades[:-1]])
+        bounds  = np.r_[starts, len(self.years)]
+        window  = self.prefix[bounds[1:]] - self.prefix[bounds[:-1]]
+        frame = pd.DataFrame(self._select(window, tournaments, sides), columns=list(MEASURES))
+        frame.insert(0, "decade", [f"{d}s" for d in decades[starts]])
+        return frame
+
+
+class TeamIndex:
+    """Team-keyed access to per-team objects built on first use from cached cells.
+
+    Subclasses set ``per_team`` to the class built from one team's cells.
+    """
+    per_team = None
+
+    def __init__(self, cells):
+        self.cells = cells
+        self._teams = {}
+
+    def team(self, team):
+        if team not in self._teams:
+            self._teams[team] = self.per_team(self.cells.loc[team:team])
+        return self._teams[team]
+
+
+class AggregateCube(TeamIndex):
+    """``TeamCube`` per team."""
+    per_team = TeamCube
@@ -0,0 +1,104 @@
+"""Elo ratings over the full match history.
+
+Follows the World Football Elo scheme: a home advantage for the listed home
+side of non-neutral matches, a K-factor per tournament and a multiplier for
+the goal difference. Everything that does not depend on the running ratings
+(K, goal multiplier, result, home advantage, team codes) is computed as
+whole arrays; only the rating recurrence itself runs in a tight loop over
+plain Python floats, in date order.
+
+``rate`` takes an optional starting ``state`` (ratings after the last rated
+match), so matches appended to ``results.csv`` can be rated without
+replaying the history.
+"""
+import numpy as np
+import pandas as pd
+
+BASE_RATING    = 1500.0
+HOME_ADVANTAGE = 100.0
+
+# K by tournament name; qualifiers not listed here get K_QUALIFIER and
+# everything else K_OTHER.
+K_FACTORS = {
+    "FIFA World Cup":         60,
+    "Confederations Cup":     50,
+    "Copa América":           50,
+    "UEFA Euro":              50,
+    "African Cup of Nations": 50,
+    "AFC Asian Cup":          50,
+    "Gold Cup":               50,
+    "CONCACAF Championship":  50,
+    "Oceania Nations Cup":    50,
+    "Friendly":               20,
+}
+K_QUALIFIER = 40
+K_OTHER     = 30
+
+
+def k_factor(tournament):
+    """K-factor of every match, from a (categorical) tournament column."""
+    tournament = tournament.astype("category")
+    per_name = np.array([K_FACTORS.get(name, K_QUALIFIER if "qualification" in name else K_OTHER)
+                         for name in tournament.cat.categories], dtype=np.float64)
+    return per_name[tournament.cat.codes.to_numpy()]
+
+
+def goal_multiplier(home_score, away_score):
+    """1 for a margin of 0-1, 1.5 for 2 and (11 + margin) / 8 beyond."""
+    margin = np.abs(np.asarray(home_score, dtype=np.int64) - np.asarray(away_score, dtype=np.int64))
+    return np.where(margin <= 1, 1.0, np.where(margin == 2, 1.5, (11.0 + margin) / 8.0))
+
+
+def _recurrence(home, away, advantage, weight, outcome, ratings):
+    """Apply matches in order to ``ratings``; return pre-match ratings and changes."""
+    rating = ratings.tolist()
+    home_pre, away_pre, change = [], [], []
+    for h, a, adv, w, s in zip(home.tolist(), away.tolist(), advantage.tolist(),
+                               weight.tolist(), outcome.tolist()):
+        rh, ra = rating[h], rating[a]
+        delta  = w * (s - 1.0 / (10.0 ** ((ra - rh - adv) / 400.0) + 1.0))
+        rating[h], rating[a] = rh + delta, ra - delta
+        home_pre.append(rh)
+        away_pre.append(ra)
+        change.append(delta)
+    ratings[:] = rating
+    return np.array(home_pre), np.array(away_pre), np.array(change)
+
+
+def rate(results, state=None):
+    """Rate ``results`` in date order, starting from ``state``.
+
+    ``state`` is a Series of ratings indexed by team name (teams missing
+    from it start at ``BASE_RATING``). Returns ``(ratings, state)``:
+    ``ratings`` is aligned with ``results`` and holds the pre-match
+    ``home_elo``/``away_elo`` and the home side's ``elo_change`` (the away
+    side's is its negative); ``state`` is the updated Series.
+    """
+    if state is None:
+        state = pd.Series(dtype=np.float64)
+    teams = pd.Index(state.index).union(pd.Index(results["home_team"].unique())
+                                        .union(results["away_team"].unique()).astype(str))
+    ratings = state.reindex(teams, fill_value=BASE_RATING).to_numpy(np.float64, copy=True)
+
+    order   = np.argsort(results["date"].to_numpy(), kind="stable")
+    ordered = results.iloc[order]
+    home_score = ordered["home_score"].to_numpy()
+    away_score = ordered["away_score"].to_numpy()
+    home_pre, away_pre, change = _recurrence(
+        teams.get_indexer(ordered["home_team"]),
+        teams.get_indexer(ordered["away_team"]),
+        np.where(ordered["neutral"].to_numpy(), 0.0, HOME_ADVANTAGE),
+        k_factor(ordered["tournament"]) * goal_multiplier(home_score, away_score),
+        (np.sign(home_score.astype(np.int64) - away_score) + 1) / 2.0,
+        ratings,
+    )
+
+    rated = np.empty((len(results), 3), dtype=np.float32)
+    rated[order] = np.column_stack([home_pre, away_pre, change])
+    frame = pd.DataFrame(rated, columns=["home_elo", "away_elo", "elo_change"], index=results.index)
+    return frame, pd.Series(ratings, index=teams, name="rating")
+
+
+def ratings_table(state):
+    """``state`` as a one-column frame, for the on-disk cache."""
+    return state.rename("rating").rename_axis("team").to_frame()
@@ -0,0 +1,54 @@
+"""Index-based filters for the sidebar year-range and tournament selections.
+
+Team slices of the long tables are sorted by date, so a year range is a pair
+of binary searches and the result a positional slice of the team's rows.
+Tournaments are categorical, so membership is a lookup of integer codes in a
+boolean table instead of a string ``isin``.
+"""
+import numpy as np
+
+
+def year_bounds(table, first, last):
+    """Positions ``[lo, hi)`` of the rows with ``first <= year <= last``."""
+    years = table["year"].to_numpy()
+    lo, hi = np.searchsorted(years, [first, last + 1], side="left")
+    return int(lo), int(hi)
+
+
+def year_slice(table, first, last):
+    """Rows of a date-sorted ``table`` whose year lies in ``[first, last]``."""
+    lo, hi = year_bounds(table, first, last)
+    return table.iloc[lo:hi]
+
+
+def tournament_mask(tournament, selected):
+    """Boolean mask of ``tournament`` (a categorical Series) in ``selected``."""
+    categories = tournament.cat.categories
+    allowed = np.zeros(len(categories) + 1, dtype=bool)   # last slot: code -1 (NaN)
+    allowed[categories.get_indexer(list(selected))] = True
+    allowed[-1] = False
+    return allowed[tournament.cat.codes.to_numpy()]
+
+
+def filter_matches(table, year_range, tournaments):
+    """Matches in ``year_range`` (inclusive) played in one of ``tournaments``.
+
+    The year range is always a slice; rows are only gathered when the
+    tournament selection actually drops some of them.
+    """
+    rows = year_slice(table, *year_range)
+    keep = tournament_mask(rows["tournament"], tournaments)
+    return rows if keep.all() else rows[keep]
+
+
+def default_filters(matches, preferred, first_year=1950):
+    """The sidebar's initial selection for a team's ``matches``.
+
+    Returns ``(years, year_range, tournaments)``: the slider bounds, the
+    default range (from ``first_year`` on) and the ``preferred`` tournaments
+    the team has played.
+    """
+    lo, hi = int(matches["year"].min()), int(matches["year"].max())
+    hi = max(hi, lo + 1)   # st.slider rejects a single-year range
+    played = set(matches["tournament"].unique())
+    return (lo, hi), (min(max(first_year, lo), hi), hi), [t for t in preferred if t in played]
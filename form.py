@@ -0,0 +1,128 @@
+"""Rolling form and streaks for every team, stored on the long match table.
+
+``with_form`` adds ``FORM_COLUMNS`` to the team-indexed, date-sorted long
+match table in one vectorized pass over all teams: rolling sums are
+differences of one cumulative sum clipped at each team's first row, and run
+lengths come from a running maximum of the positions where a run breaks.
+``with_form_after`` computes the same columns for rows appended to a cached
+table from each team's last ``FORM_WINDOW`` cached rows only, carrying the
+runs on from where they stood. ``longest_runs`` reads the longest runs per team
+back off the columns.
+"""
+import numpy as np
+import pandas as pd
+
+FORM_WINDOW  = 10   # matches in the rolling form window
+FORM_COLUMNS = ("form_ppg", "form_gd", "unbeaten_run", "winning_run")
+RUNS = {"unbeaten": "unbeaten_run", "winning": "winning_run"}
+
+
+def _group_starts(index):
+    """Mask of the first row of each team in a team-sorted ``index``."""
+    codes = pd.factorize(index)[0]
+    return np.r_[True, codes[1:] != codes[:-1]] if len(codes) else np.zeros(0, dtype=bool)
+
+
+def _rolling_sum(values, starts, window):
+    """Sum of each row's last ``window`` values within its team, and their count."""
+    pos   = np.arange(len(values))
+    first = np.maximum.accumulate(np.where(starts, pos, 0))
+    lo    = np.maximum(pos - window + 1, first)
+    csum  = np.r_[0, np.cumsum(values, dtype=np.int64)]
+    return csum[pos + 1] - csum[lo], pos - lo + 1
+
+
+def _runs(condition, starts):
+    """Length of the run of True ``condition`` ending at each row, within its team."""
+    pos   = np.arange(len(condition))
+    marks = np.where(~condition, pos, np.where(starts, pos - 1, -1))
+    return pos - np.maximum.accumulate(marks) if len(pos) else pos
+
+
+def form_columns(matches, window=FORM_WINDOW):
+    """``FORM_COLUMNS`` for a team-indexed, date-sorted long match table.
+
+    ``form_ppg`` is points per game (3 a win, 1 a draw) and ``form_gd`` the
+    goal difference over the team's last ``window`` matches up to and
+    including each row (fewer for its first matches); ``unbeaten_run`` and
+    ``winning_run`` count consecutive matches without a loss and with a win.
+    """
+    starts = _group_starts(matches.index)
+    diff   = (matches["scored"].to_numpy(np.int16) - matches["conceded"].to_numpy(np.int16))
+    points = np.where(diff > 0, 3, np.where(diff == 0, 1, 0))
+    points_sum, count = _rolling_sum(points, starts, window)
+    gd_sum, _         = _rolling_sum(diff, starts, window)
+    return {
+        "form_ppg":     (points_sum / count).astype(np.float32),
+        "form_gd":      gd_sum.astype(np.int16),
+        "unbeaten_run": _runs(diff >= 0, starts).astype(np.int16),
+        "winning_run":  _runs(diff > 0, starts).astype(np.int16),
+    }
+
+
+def with_form(matches, window=FORM_WINDOW):
+    """``matches`` with ``FORM_COLUMNS`` added."""
+    return matches.assign(**form_columns(matches, window))
+
+
+def with_form_after(history, rows, window=FORM_WINDOW):
+    """``rows`` (appended after ``history``) with ``FORM_COLUMNS`` added.
+
+    ``history`` has a sorted categorical team index. Only the last
+    ``window`` rows of ``history`` for each team in ``rows`` are read (found
+    by binary search on the team codes): they fill the rolling windows, and
+    their run lengths carry the runs on past the start of that tail.
+    """
+    codes = history.index.codes
+    teams = history.index.categories.get_indexer(rows.index.unique())
+    teams = teams[teams >= 0]
+    hi = np.searchsorted(codes, teams, side="right")
+    lo = np.maximum(np.searchsorted(codes, teams, side="left"), hi - window)
+    tail = history.iloc[np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)] +
+                                       [np.zeros(0, np.int64)])]
+    both = pd.concat([tail[["scored", "conceded"] + list(RUNS.values())],
+                      rows[["scored", "conceded"]].assign(row=np.arange(len(rows)))])
+    both = both.iloc[np.argsort(pd.factorize(both.index, sort=True)[0], kind="stable")]
+    columns = form_columns(both, window)
+
+    # Runs counted from the tail's first row continue the cached run there.
+    starts = _group_starts(both.index)
+    pos    = np.arange(len(both))
+    offset = pos - np.maximum.accumulate(np.where(starts, pos, 0))
+    for name in RUNS.values():
+        cached = both[name].to_numpy(np.float64)
+        carry  = np.where(starts, np.nan_to_num(cached) - 1, 0)
+        carry  = carry[np.maximum.accumulate(np.where(starts, pos, 0))]
+        unbroken = columns[name] == offset + 1
+        columns[name] = np.where(unbroken & (carry > 0), columns[name] + carry,
+                                 columns[name]).astype(np.int16)
+
+    row = both["row"].to_numpy(np.float64)
+    appended = ~np.isnan(row)
+    order = np.argsort(row[appended])
+    return rows.assign(**{name: values[appended][order] for name, values in columns.items()})
+
+
+def longest_runs(matches, run):
+    """Longest ``run`` ("unbeaten" or "winning") of every team.
+
+    One row per team with the streak's ``matches``, ``start`` and ``end``
+    dates, longest first (earlier streaks first on ties); teams that never
+    had one are left out.
+    """
+    lengths = matches[RUNS[run]].to_numpy()
+    starts  = np.flatnonzero(_group_starts(matches.index))
+    team_id = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(lengths)]))
+    # Per team, the row where its longest run ends (the first one on ties).
+    order = np.lexsort((np.arange(len(lengths)), -lengths, team_id))
+    best  = order[np.searchsorted(team_id[order], np.arange(len(starts)))]
+    best  = best[lengths[best] > 0]
+    dates = matches["date"].to_numpy()
+    frame = pd.DataFrame({
+        "team":    matches.index[best],
+        "matches": lengths[best].astype(np.int64),
+        "start":   dates[best - lengths[best] + 1],
+        "end":     dates[best],
+    })
+    return frame.sort_values(["matches", "end"], ascending=[False, True],
+                             kind="stable").reset_index(drop=True)
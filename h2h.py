@@ -0,0 +1,140 @@
+"""All-pairs head-to-head records behind the rivals charts.
+
+``h2h_cells`` reduces the long match table to one row per
+(team, year, opponent, tournament) with results and goals; it is cached with
+the other tables. Rows are sorted by team and then year, so
+``HeadToHead`` finds a team's rows in a year window with two binary searches
+and totals them per opponent with ``np.bincount`` over integer opponent
+codes. The whole-world matrix is the same reduction over (team, opponent)
+pair codes.
+"""
+import numpy as np
+import pandas as pd
+
+MEASURES = ("matches", "wins", "draws", "losses", "scored", "conceded")
+
+
+def h2h_cells(matches):
+    """One row per (team, year, opponent, tournament) with every measure in ``MEASURES``.
+
+    ``first`` is the ``match_id`` of the pair's earliest match, used to break
+    ties between equally frequent opponents by first meeting.
+    """
+    result = matches["result"].array
+    frame = pd.DataFrame({
+        "team":       matches.index,
+        "year":       matches["year"].to_numpy(),
+        "opponent":   matches["opponent"].array,
+        "tournament": matches["tournament"].array,
+        "matches":    1,
+        "wins":       result == "Win",
+        "draws":      result == "Draw",
+        "losses":     result == "Loss",
+        "scored":     matches["scored"].to_numpy(),
+        "conceded":   matches["conceded"].to_numpy(),
+        "first":      matches["match_id"].to_numpy(),
+    })
+    keys  = ["team", "year", "opponent", "tournament"]
+    cells = frame.groupby(keys, observed=True, sort=True).agg(
+        {**{measure: "sum" for measure in MEASURES}, "first": "min"})
+    return cells.astype(np.int32).reset_index(level=["year", "opponent", "tournament"])
+
+
+def _names(values):
+    """Distinct names in ``values`` (the categories of a categorical)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return pd.Index(values.categories if isinstance(values, pd.CategoricalIndex)
+                        else values.cat.categories)
+    return pd.Index(pd.unique(values))
+
+
+def _codes(values, names):
+    """Positions of ``values`` in the sorted Index ``names`` (-1 if absent)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.array if isinstance(values, pd.Series) else values
+        lookup = np.r_[names.get_indexer(values.categories), -1]
+        return lookup[values.codes]
+    return names.get_indexer(values)
+
+
+class HeadToHead:
+    """Head-to-head queries over cached ``h2h_cells``."""
+
+    def __init__(self, cells):
+        self.cells = cells
+        team, opponent = cells.index, cells["opponent"]
+        self.teams = _names(team).union(_names(opponent)).astype(str)
+        self.team_code = _codes(team, self.teams)
+        self.opp_code  = _codes(opponent, self.teams)
+        self.bounds    = np.searchsorted(self.team_code, np.arange(len(self.teams) + 1))
+        self.years     = cells["year"].to_numpy()
+        tournament     = cells["tournament"].astype("category").array
+        self.tournaments     = tournament.categories
+        self.tournament_code = tournament.codes
+        self.values = cells[list(MEASURES)].to_numpy()
+        self.first  = cells["first"].to_numpy()
+
+    def _keep(self, rows, tournaments):
+        """Mask of ``rows`` played in one of ``tournaments`` (all if None)."""
+        codes = self.tournament_code[rows]
+        if tournaments is None:
+            return np.ones(len(codes), dtype=bool)
+        allowed = np.zeros(len(self.tournaments) + 1, dtype=bool)   # last slot: code -1
+        allowed[self.tournaments.get_indexer(list(tournaments))] = True
+        allowed[-1] = False
+        return allowed[codes]
+
+    def _sum_by(self, codes, rows, size):
+        """``MEASURES`` of ``rows`` summed per code in ``range(size)``."""
+        values = self.values[rows]
+        return np.stack([np.bincount(codes, weights=values[:, j], minlength=size)
+                         for j in range(len(MEASURES))], axis=1).astype(np.int64)
+
+    def record(self, team, year_range=None, tournaments=None):
+        """``team``'s record against every opponent met in the window.
+
+        One row per opponent (sorted by name) with ``MEASURES`` and ``first``.
+        """
+        t = self.teams.get_indexer([team])[0]
+        lo, hi = (self.bounds[t], self.bounds[t + 1]) if t >= 0 else (0, 0)
+        if year_range is not None:
+            first, last = year_range
+            a, b = np.searchsorted(self.years[lo:hi], [first, last + 1], side="left")
+            lo, hi = lo + a, lo + b
+        rows = np.arange(lo, hi)[self._keep(slice(lo, hi), tournaments)]
+        opp  = self.opp_code[rows]
+        size = len(self.teams)
+        sums = self._sum_by(opp, rows, size)
+        earliest = np.full(size, np.iinfo(np.int64).max)
+        np.minimum.at(earliest, opp, self.first[rows])
+        met = np.flatnonzero(sums[:, 0])
+        frame = pd.DataFrame(sums[met], columns=list(MEASURES))
+        frame.insert(0, "opponent", self.teams[met])
+        frame["first"] = earliest[met]
+        return frame
+
+    def top(self, team, k, year_range=None, tournaments=None):
+        """``team``'s ``k`` most-played opponents in the window.
+
+        Most matches first; ties go to the opponent met first in the window.
+        """
+        record = self.record(team, year_range, tournaments)
+        order  = np.lexsort((record["first"].to_numpy(), -record["matches"].to_numpy()))
+        return record.iloc[order[:k]].reset_index(drop=True)
+
+    def matrix(self, year_range=None, tournaments=None, size=20):
+        """Pairwise ``MEASURES`` among the ``size`` teams with most matches.
+
+        Returns ``(teams, values)`` where ``values[i, j]`` is team ``i``'s
+        record against team ``j`` as a (size, size, len(MEASURES)) array.
+        """
+        keep = self._keep(slice(None), tournaments)
+        if year_range is not None:
+            first, last = year_range
+            keep &= (self.years >= first) & (self.years <= last)
+        rows  = np.flatnonzero(keep)
+        n     = len(self.teams)
+        pairs = self._sum_by(self.team_code[rows] * n + self.opp_code[rows], rows, n * n)
+        pairs = pairs.reshape(n, n, len(MEASURES))
+        busiest = np.argsort(-pairs[:, :, 0].sum(axis=1), kind="stable")[:size]
+        return self.teams[busiest].tolist(), pairs[np.ix_(busiest, busiest)]
@@ -0,0 +1,914 @@
+"""Data pipeline for the football analytics dashboard.
+
+Plain pandas/NumPy with no Streamlit imports, so the same preprocessing can be
+cached by app.py and reused by benchmarks and scripts.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import profiling
+from cube import MEASURES as CUBE_MEASURES, AggregateCube, cube_cells
+from elo import rate, ratings_table
+from form import longest_runs, with_form, with_form_after
+from h2h import MEASURES as H2H_MEASURES, HeadToHead, h2h_cells
+from scorers import ScorerIndex, scorer_cells
+from store import read_tables, write_tables
+from timing import TimingIndex, timing_cells
+
+logger = logging.getLogger("dashboard.pipeline")
+
+DATA_DIR   = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR  = os.path.join(DATA_DIR, ".cache", "pipeline")
+DATA_FILES = ("results.csv", "goalscorers.csv", "shootouts.csv")
+NAMES_FILE = "former_names.csv"
+TABLES     = ("matches", "goals", "cells", "scorer_cells", "h2h_cells", "timing_cells",
+              "elo_state")
+
+# Compact read-time schema. Team-name columns are read as categories and then
+# recoded onto one shared ``team`` dtype (see ``_unify_teams``) so columns can
+# be swapped and compared through their integer codes.
+TEAM_COLUMNS = ("home_team", "away_team", "team", "winner", "first_shooter")
+SCHEMA = {
+    "results.csv": {
+        "home_team": "category", "away_team": "category",
+        "home_score": "int8", "away_score": "int8",
+        "tournament": "category", "city": "category", "country": "category",
+        "neutral": "bool",
+    },
+    "goalscorers.csv": {
+        "home_team": "category", "away_team": "category", "team": "category",
+        "scorer": "category", "minute": "str",
+        "own_goal": "bool", "penalty": "bool",
+    },
+    "shootouts.csv": {
+        "home_team": "category", "away_team": "category",
+        "winner": "category", "first_shooter": "category",
+    },
+}
+DATE_FORMAT = "%Y-%m-%d"
+
+# Bump whenever the derivation below changes so stale caches are not reused.
+CACHE_VERSION = 14
+
+# ── Team perspective ──────────────────────────────────────────────────────────
+RESULT_LABELS = np.array(["Loss", "Draw", "Win"])
+VENUE_LABELS  = np.array(["Home", "Away", "Neutral"])
+
+
+def result_labels(scored, conceded):
+    """Vectorized Win/Draw/Loss labels from two aligned score arrays."""
+    codes = np.sign(np.asarray(scored, dtype=np.int16) - np.asarray(conceded, dtype=np.int16)) + 1
+    return pd.Categorical.from_codes(codes.astype(np.int8), categories=RESULT_LABELS)
+
+
+def _pick(mask, a, b):
+    """Elementwise ``a if mask else b`` for two aligned columns.
+
+    Categoricals sharing a dtype are swapped through their codes, so the
+    result stays categorical instead of decoding to an object array.
+    """
+    if isinstance(a.dtype, pd.CategoricalDtype) and a.dtype == b.dtype:
+        return pd.Categorical.from_codes(np.where(mask, a.cat.codes, b.cat.codes),
+                                         dtype=a.dtype)
+    return np.where(mask, a.to_numpy(), b.to_numpy())
+
+
+def _years(dates):
+    return dates.dt.year.astype(np.int16)
+
+
+def _perspective(matches, is_home):
+    """Copy of ``matches`` seen from the home side where ``is_home`` is True."""
+    side = matches.copy()
+    home_team,  away_team  = side["home_team"],  side["away_team"]
+    home_score, away_score = side["home_score"], side["away_score"]
+
+    side["team"]     = _pick(is_home, home_team, away_team)
+    side["opponent"] = _pick(is_home, away_team, home_team)
+    side["scored"]   = _pick(is_home, home_score, away_score)
+    side["conceded"] = _pick(is_home, away_score, home_score)
+    side["is_home"]  = is_home
+    side["venue"]    = pd.Categorical.from_codes(
+        np.where(side["neutral"].to_numpy(), 2, np.where(is_home, 0, 1)),
+        categories=VENUE_LABELS)
+    side["result"]   = result_labels(side["scored"], side["conceded"])
+    side["year"]     = _years(side["date"])
+    side["decade"]   = pd.Categorical((side["year"] // 10 * 10).astype(str) + "s")
+    return side
+
+
+def team_perspective(results, team):
+    """Return ``team``'s matches seen from its own side of the scoreline.
+
+    Adds ``team``, ``opponent``, ``scored``, ``conceded``, ``is_home``,
+    ``venue``, ``result``, ``year`` and ``decade`` using masked column swaps instead of a
+    row-wise ``apply``.
+    """
+    home = (results["home_team"] == team).to_numpy()
+    away = (results["away_team"] == team).to_numpy()
+    played = home | away
+    return _perspective(results[played], home[played])
+
+
+# ── Shootouts ─────────────────────────────────────────────────────────────────
+SHOOTOUT_KEYS = ["date", "home_team", "away_team"]
+
+
+def join_shootouts(results, shootouts):
+    """``results`` plus each match's ``shootout_winner`` and ``first_shooter``.
+
+    A left hash join on (date, home_team, away_team), so both columns are
+    missing for matches without a shootout. Shootouts with no matching row in
+    ``results`` are dropped, and of several shootouts for one match only the
+    first is kept.
+    """
+    shootouts = shootouts[SHOOTOUT_KEYS + ["winner", "first_shooter"]]
+    repeated  = shootouts.duplicated(SHOOTOUT_KEYS).to_numpy()
+    if repeated.any():
+        logger.warning("shootouts: %d repeated (date, home_team, away_team) rows dropped",
+                       repeated.sum())
+        shootouts = shootouts[~repeated]
+    return results.merge(shootouts.rename(columns={"winner": "shootout_winner"}),
+                         on=SHOOTOUT_KEYS, how="left", validate="many_to_one")
+
+
+# ── Former names ──────────────────────────────────────────────────────────────
+def read_former_names(data_dir=DATA_DIR):
+    """``former_names.csv`` with parsed dates, sorted for ``merge_asof``."""
+    former = pd.read_csv(os.path.join(data_dir, NAMES_FILE), dtype=str)
+    for column in ("start_date", "end_date"):
+        former[column] = pd.to_datetime(former[column], format=DATE_FORMAT)
+    return former.sort_values("start_date", ignore_index=True)
+
+
+def resolve_names(names, dates, former):
+    """``names`` with each former name replaced by its current one.
+
+    A name is replaced only where its ``dates`` value falls inside the
+    former name's [start_date, end_date] interval. The interval lookup is
+    one ``merge_asof`` by name on the rows that carry a former name at all.
+    """
+    hit = names.isin(former["former"]).to_numpy()
+    if not hit.any():
+        return names
+    rows = pd.DataFrame({
+        "row":    np.flatnonzero(hit),
+        "former": names.to_numpy()[hit].astype(str),
+        "date":   dates.to_numpy()[hit].astype(former["start_date"].dtype),
+    }).sort_values("date", kind="stable")
+    matched = pd.merge_asof(rows, former, left_on="date", right_on="start_date", by="former")
+    matched = matched[(matched["date"] <= matched["end_date"]).to_numpy()]
+    if matched.empty:
+        return names
+
+    resolved = names.copy()
+    if isinstance(resolved.dtype, pd.CategoricalDtype):
+        new = pd.Index(matched["current"].unique()).difference(resolved.cat.categories)
+        resolved = resolved.cat.add_categories(new)
+    resolved.iloc[matched["row"].to_numpy()] = matched["current"].to_numpy()
+    if isinstance(resolved.dtype, pd.CategoricalDtype):
+        resolved = resolved.cat.remove_unused_categories()
+    return resolved
+
+
+def resolve_former_names(frames, former):
+    """Resolve every ``TEAM_COLUMNS`` column of ``frames`` in place by match date.
+
+    Venue ``country`` is left as recorded: ``former_names.csv`` maps team
+    lineages (Soviet Union -> Russia, Ireland -> Northern Ireland), which are
+    not the successors of the territory a match was played in.
+    """
+    for frame in frames:
+        for column in TEAM_COLUMNS:
+            if column in frame.columns:
+                frame[column] = resolve_names(frame[column], frame["date"], former)
+
+
+# ── Long tables indexed by team ───────────────────────────────────────────────
+def long_matches(results, first_id=0):
+    """Every match twice, once from each side, indexed by ``team``.
+
+    Rows are sorted by team, date and original position in ``results``
+    (kept as ``match_id``), so ``team_slice`` is a binary search on the index
+    rather than a boolean scan and each team's rows are in date order for the
+    filters; ``first_id`` offsets ``match_id`` for rows appended to a cached
+    table. ``tournament`` is categorical so filters can test integer codes.
+    When ``results`` carries ``shootout_winner`` (see ``join_shootouts``),
+    ``shootout`` and ``shootout_won`` flag the team's shootouts; when it
+    carries Elo ratings (see ``elo.rate``), ``elo``, ``opp_elo`` and
+    ``elo_change`` give them from the team's side.
+    """
+    matches = results.assign(match_id=np.arange(first_id, first_id + len(results), dtype=np.int32),
+                             tournament=results["tournament"].astype("category"))
+    n = len(matches)
+    both = pd.concat([_perspective(matches, np.ones(n, dtype=bool)),
+                      _perspective(matches, np.zeros(n, dtype=bool))],
+                     ignore_index=True)
+    if "shootout_winner" in both.columns:
+        both["shootout"]     = both["shootout_winner"].notna()
+        both["shootout_won"] = both["shootout_winner"].eq(both["team"]).to_numpy(bool)
+    if "home_elo" in both.columns:
+        is_home = both["is_home"].to_numpy()
+        home_elo, away_elo = both["home_elo"], both["away_elo"]
+        both["elo"]        = _pick(is_home, home_elo, away_elo)
+        both["opp_elo"]    = _pick(is_home, away_elo, home_elo)
+        both["elo_change"] = np.where(is_home, both["elo_change"], -both["elo_change"])
+    return both.sort_values(["team", "date", "match_id"]).set_index("team")
+
+
+def goal_tournaments(goalscorers, results):
+    """Tournament of each goal's match in ``results`` (missing if not found)."""
+    matches = results[SHOOTOUT_KEYS + ["tournament"]].drop_duplicates(SHOOTOUT_KEYS)
+    return goalscorers[SHOOTOUT_KEYS].merge(matches, on=SHOOTOUT_KEYS, how="left",
+                                            validate="many_to_one")["tournament"]
+
+
+def long_goals(goalscorers, results):
+    """Goalscorer rows indexed by the scoring ``team``, in date order.
+
+    Adds ``year``, the ``opponent`` the goal was scored against and the
+    match's ``tournament``, looked up in ``results`` (or any frame with the
+    ``SHOOTOUT_KEYS`` and ``tournament`` columns, such as the long matches).
+    """
+    is_home = (goalscorers["team"] == goalscorers["home_team"]).to_numpy()
+    goals = goalscorers.assign(
+        year=_years(goalscorers["date"]),
+        opponent=_pick(is_home, goalscorers["away_team"], goalscorers["home_team"]),
+        tournament=goal_tournaments(goalscorers, results).astype("category").array)
+    return goals.sort_values(["team", "date"], kind="stable").set_index("team")
+
+
+def team_slice(table, team):
+    """Rows of a team-indexed long table for ``team`` (empty if unknown)."""
+    index = table.index
+    if isinstance(index, pd.CategoricalIndex) and team not in index.categories:
+        return table.iloc[:0]
+    return table.loc[team:team]
+
+
+def team_names(table):
+    """Sorted unique teams of a team-indexed long table."""
+    return table.index.unique().tolist()
+
+
+# ── Loading and the on-disk cache ─────────────────────────────────────────────
+def read_raw(data_dir=DATA_DIR):
+    """Parse the three CSVs into the compact ``SCHEMA``.
+
+    Dates are parsed with an explicit ``DATE_FORMAT``, former team names are
+    resolved to current ones as of each match date, and team-name columns
+    end up on one shared categorical dtype.
+    """
+    return parse_sources([os.path.join(data_dir, name) for name in DATA_FILES], data_dir)
+
+
+def parse_sources(sources, data_dir=DATA_DIR):
+    """``read_raw`` for one path or buffer per ``DATA_FILES`` entry."""
+    with profiling.stage("load:csv_parse"):
+        frames = [pd.read_csv(source, dtype=SCHEMA[name])
+                  for name, source in zip(DATA_FILES, sources)]
+        for frame in frames:
+            _parse_text(frame)
+        former = read_former_names(data_dir)
+    with profiling.stage("load:former_names"):
+        resolve_former_names(frames, former)
+    _unify_teams(frames)
+    return frames
+
+
+def parse_minutes(minutes):
+    """Goal minutes read as text, as ``Int16``.
+
+    Stoppage time written as "45+2" or "90+4" counts as the period's last
+    minute (45, 90, ...), as most of the source already records it; blank
+    or unreadable minutes are missing.
+    """
+    values = pd.to_numeric(minutes, errors="coerce")
+    extra  = (values.isna() & minutes.notna()).to_numpy()
+    if extra.any():
+        base = minutes[extra].str.split("+", n=1).str[0].str.strip()
+        values[extra] = pd.to_numeric(base, errors="coerce")
+    return values.where((values >= 0) & (values < 1000)).round().astype("Int16")
+
+
+def _parse_text(frame):
+    """Parse the columns ``SCHEMA`` reads as text: ``date`` and ``minute``."""
+    frame["date"] = pd.to_datetime(frame["date"], format=DATE_FORMAT)
+    if "minute" in frame.columns:
+        frame["minute"] = parse_minutes(frame["minute"])
+
+
+def _unify_teams(frames):
+    """Recode every team-name column in ``frames`` onto one sorted category set."""
+    columns = [(frame, column) for frame in frames for column in TEAM_COLUMNS
+               if column in frame.columns]
+    names = set()
+    for frame, column in columns:
+        names.update(frame[column].cat.categories)
+    dtype = pd.CategoricalDtype(sorted(names))
+    for frame, column in columns:
+        frame[column] = frame[column].astype(dtype)
+
+
+def preprocess(results, goalscorers, shootouts):
+    """Build every derived table, keyed by the names in ``TABLES``."""
+    with profiling.stage("load:elo"):
+        ratings, state = rate(results)
+    with profiling.stage("load:preprocess"):
+        matches = with_form(long_matches(join_shootouts(results.join(ratings), shootouts)))
+        goals   = long_goals(goalscorers, results)
+        return {
+            "matches":      matches,
+            "goals":        goals,
+            "cells":        cube_cells(matches),
+            "scorer_cells": scorer_cells(goals),
+            "h2h_cells":    h2h_cells(matches),
+            "timing_cells": timing_cells(goals),
+            "elo_state":    ratings_table(state),
+        }
+
+
+def fingerprint(data_dir=DATA_DIR):
+    """Content hash of the source CSVs plus ``CACHE_VERSION``."""
+    digest = hashlib.blake2b(f"v{CACHE_VERSION}".encode(), digest_size=10)
+    for name in DATA_FILES + (NAMES_FILE,):
+        with open(os.path.join(data_dir, name), "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def slice_key(teams=None, tournaments=None):
+    """Short, order-independent hash of a ``read_filtered`` selection."""
+    spec = [None if names is None else sorted(set(names)) for names in (teams, tournaments)]
+    return hashlib.blake2b(json.dumps(spec).encode(), digest_size=6).hexdigest()
+
+
+def data_slice():
+    """``teams`` and ``tournaments`` for ``Dataset.load`` from the environment.
+
+    ``DASHBOARD_TEAMS`` and ``DASHBOARD_TOURNAMENTS`` are comma-separated
+    names; either left unset (or empty) means no restriction.
+    """
+    selection = {}
+    for name, variable in (("teams", "DASHBOARD_TEAMS"), ("tournaments", "DASHBOARD_TOURNAMENTS")):
+        names = [item.strip() for item in os.environ.get(variable, "").split(",") if item.strip()]
+        selection[name] = names or None
+    return selection
+
+
+def _build_tables(data_dir, cache_dir, teams, tournaments):
+    """Tables for a ``load_tables`` cache miss.
+
+    A slice is always preprocessed from the streamed rows; the full data is
+    merged from appended rows into the cached tables when ``ingest_appended``
+    can, and rebuilt otherwise.
+    """
+    if teams is not None or tournaments is not None:
+        return preprocess(*read_filtered(data_dir, teams, tournaments, PREPROCESS_COLUMNS))
+    if cache_dir is not None:
+        with profiling.stage("load:incremental"):
+            tables = ingest_appended(data_dir, cache_dir)
+        if tables is not None:
+            return tables
+    return preprocess(*read_raw(data_dir))
+
+
+def load_tables(data_dir=DATA_DIR, cache_dir=CACHE_DIR, key=None, teams=None, tournaments=None):
+    """Preprocessed tables, mapped from the on-disk cache when it is current.
+
+    The cache lives in ``cache_dir/<fingerprint>/`` as memory-mapped column
+    files (see ``store``), so every process that loads an entry shares one
+    read-only copy of it. Editing any CSV changes the fingerprint, so the
+    tables are rebuilt and older entries removed.
+    Pass ``cache_dir=None`` to always rebuild, and ``key`` to reuse a
+    fingerprint the caller already computed.
+
+    ``teams`` and/or ``tournaments`` load only that slice of the data: the
+    CSVs are streamed through ``read_filtered`` so only its rows are ever
+    held, and the slice is cached in its own ``<fingerprint>-<slice_key>``
+    entry. Appended rows are not merged into a slice; it is rebuilt.
+    """
+    sliced = teams is not None or tournaments is not None
+    if cache_dir is None:
+        return _build_tables(data_dir, None, teams, tournaments)
+
+    key   = key or fingerprint(data_dir)
+    name  = f"{key}-{slice_key(teams, tournaments)}" if sliced else key
+    entry = os.path.join(cache_dir, name)
+    try:
+        with profiling.stage("load:cache_read"):
+            return read_tables(entry, TABLES)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    tables = _build_tables(data_dir, cache_dir, teams, tournaments)
+    manifest = source_manifest(data_dir)
+    if sliced:
+        manifest["slice"] = {"teams": teams, "tournaments": tournaments}
+    # A full entry replaces every older one; a slice only older slices.
+    stale = ((lambda old: "-" in old and not old.startswith(key)) if sliced
+             else (lambda old: not old.startswith(key)))
+    try:
+        with profiling.stage("load:cache_write"):
+            _write_cache(tables, cache_dir, entry, manifest, stale)
+    except OSError:
+        pass   # a read-only deploy still works, just uncached
+    else:
+        tables = read_tables(entry, TABLES)   # serve the shared mapping, not this copy
+    return tables
+
+
+STAGING = ".tmp"   # staging directories are named <entry>.tmp<pid>
+
+
+def _write_cache(tables, cache_dir, entry, manifest, stale):
+    """Write ``tables`` to ``entry`` through a staging directory, then swap it in.
+
+    Entries for which ``stale(name)`` is true are removed, and so are
+    staging directories left behind by writers that died or that were
+    writing a stale entry. A failed write removes its own staging directory.
+    """
+    staging = f"{entry}{STAGING}{os.getpid()}"
+    try:
+        os.makedirs(staging, exist_ok=True)
+        write_tables(tables, staging)
+        with open(os.path.join(staging, MANIFEST), "w") as fh:
+            json.dump(manifest, fh)
+        for old in os.listdir(cache_dir):
+            name, _, pid = old.partition(STAGING)
+            if stale(name) or (pid and old != os.path.basename(staging) and not _alive(pid)):
+                shutil.rmtree(os.path.join(cache_dir, old), ignore_errors=True)
+        os.replace(staging, entry)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def _alive(pid):
+    """Whether process ``pid`` (text) may still be running."""
+    if not pid.isdigit() or os.name == "nt":   # no cheap liveness probe on Windows
+        return pid.isdigit()
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass   # exists, owned by someone else
+    return True
+
+
+# ── Streaming reads ───────────────────────────────────────────────────────────
+# For archives too large to parse whole: the CSVs are read in fixed-size
+# chunks and each chunk is filtered before the next is parsed, so peak
+# memory is one chunk plus the rows kept rather than the whole file.
+CHUNK_ROWS = 200_000
+
+# What ``preprocess`` reads; ``city`` and ``country`` are not used downstream.
+PREPROCESS_COLUMNS = ("date", "home_team", "away_team", "home_score", "away_score",
+                      "tournament", "neutral", "team", "scorer", "minute", "own_goal",
+                      "penalty", "winner", "first_shooter")
+
+
+def involves(frame, teams=None, tournaments=None):
+    """Mask of ``frame`` rows played by one of ``teams`` in one of ``tournaments``."""
+    keep = np.ones(len(frame), dtype=bool)
+    if teams is not None:
+        keep &= (frame["home_team"].isin(teams) | frame["away_team"].isin(teams)).to_numpy()
+    if tournaments is not None and "tournament" in frame.columns:
+        keep &= frame["tournament"].isin(tournaments).to_numpy()
+    return keep
+
+
+def stream_csv(source, name, teams=None, tournaments=None, columns=None,
+               chunksize=CHUNK_ROWS, matches=None):
+    """Rows of the ``DATA_FILES`` entry ``name`` that pass the filters.
+
+    Parses ``chunksize`` rows at a time with the ``SCHEMA`` dtypes and only
+    the file's ``columns`` (default: all; the filter columns are always
+    read). ``teams`` matches either side and ``tournaments`` applies where
+    the file has a tournament; ``matches``, a ``SHOOTOUT_KEYS`` MultiIndex,
+    keeps only the rows of those matches. Each chunk keeps just the matching
+    rows and the categories they use before the next one is parsed.
+    """
+    usecols = None
+    if columns is not None:
+        wanted  = set(columns) | {"date", "home_team", "away_team", "tournament"}
+        usecols = wanted.__contains__
+    kept = []
+    for chunk in pd.read_csv(source, dtype=SCHEMA[name], usecols=usecols, chunksize=chunksize):
+        keep = involves(chunk, teams, tournaments)
+        if matches is not None:
+            keep &= pd.MultiIndex.from_frame(chunk[SHOOTOUT_KEYS]).isin(matches)
+        chunk = chunk[keep]
+        for column in chunk.select_dtypes("category").columns:
+            chunk[column] = chunk[column].cat.remove_unused_categories()
+        kept.append(chunk)
+    return _concat(kept)
+
+
+def read_filtered(data_dir=DATA_DIR, teams=None, tournaments=None, columns=None,
+                  chunksize=CHUNK_ROWS):
+    """``read_raw`` for only the matches of ``teams`` in ``tournaments``, streamed.
+
+    Either filter may be None for no restriction, and ``columns`` limits
+    what is parsed (``PREPROCESS_COLUMNS`` is enough for ``preprocess``).
+    ``teams`` are current names; their former names are read too and
+    resolved by date as in ``read_raw``. Goals and shootouts are streamed
+    after the results and kept for the kept matches only, so ``preprocess``
+    of the result is the dataset for that slice (with Elo ratings that only
+    see those matches). Raises ``ValueError`` if no match is left.
+    """
+    former = read_former_names(data_dir)
+    lookup = teams
+    if teams is not None:
+        lookup = set(teams) | set(former.loc[former["current"].isin(teams), "former"])
+    with profiling.stage("load:csv_stream"):
+        frames = [stream_csv(os.path.join(data_dir, DATA_FILES[0]), DATA_FILES[0], lookup,
+                             tournaments, columns, chunksize)]
+        streamed = pd.MultiIndex.from_frame(frames[0][SHOOTOUT_KEYS])
+        frames += [stream_csv(os.path.join(data_dir, name), name, lookup, None, columns,
+                              chunksize, streamed)
+                   for name in DATA_FILES[1:]]
+        for frame in frames:
+            _parse_text(frame)
+    with profiling.stage("load:former_names"):
+        resolve_former_names(frames, former)
+    _unify_teams(frames)
+
+    results = frames[0][involves(frames[0], teams)]
+    if results.empty:
+        raise ValueError(f"no matches for teams={teams} in tournaments={tournaments}")
+    played  = pd.MultiIndex.from_frame(results[SHOOTOUT_KEYS])
+    return [results.reset_index(drop=True)] + [
+        frame[pd.MultiIndex.from_frame(frame[SHOOTOUT_KEYS]).isin(played)].reset_index(drop=True)
+        for frame in frames[1:]]
+
+
+# ── Incremental ingest ────────────────────────────────────────────────────────
+# A cache entry records the size and content hash of each source file. When
+# the files have only grown since (rows appended at the end, same former
+# names), the appended bytes are parsed on their own and folded into the
+# cached tables instead of rebuilding them from the full history.
+MANIFEST = "manifest.json"
+
+# Per cached aggregate: group keys after ``team``, aggregation and whether
+# groups are sorted (the scorer cells keep first-goal order instead).
+AGGREGATES = {
+    "cells":        (["tournament", "side", "year"],
+                     dict.fromkeys(CUBE_MEASURES, "sum"), True),
+    "scorer_cells": (["scorer", "year"], {"goals": "sum"}, False),
+    "h2h_cells":    (["year", "opponent", "tournament"],
+                     {**dict.fromkeys(H2H_MEASURES, "sum"), "first": "min"}, True),
+    "timing_cells": (["tournament", "year", "side", "bucket", "kind"], {"goals": "sum"}, True),
+}
+
+
+def _digest(path, size):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        digest.update(fh.read(size))
+    return digest.hexdigest()
+
+
+def source_manifest(data_dir=DATA_DIR):
+    """Size and content hash of every source file."""
+    files = {}
+    for name in DATA_FILES + (NAMES_FILE,):
+        path = os.path.join(data_dir, name)
+        with open(path, "rb") as fh:
+            content = fh.read()
+        files[name] = {"bytes":  len(content),
+                       "digest": hashlib.blake2b(content, digest_size=16).hexdigest()}
+    return {"version": CACHE_VERSION, "files": files}
+
+
+def appended_offsets(manifest, data_dir=DATA_DIR):
+    """Byte offset of the rows appended to each data file since ``manifest``.
+
+    None unless every file still starts with exactly the bytes the manifest
+    describes, ending on a line break, and the former names are unchanged.
+    """
+    if manifest.get("version") != CACHE_VERSION:
+        return None
+    offsets = {}
+    for name in DATA_FILES + (NAMES_FILE,):
+        path, known = os.path.join(data_dir, name), manifest["files"][name]
+        size = os.path.getsize(path)
+        if size < known["bytes"] or (name == NAMES_FILE and size != known["bytes"]):
+            return None
+        if _digest(path, known["bytes"]) != known["digest"]:
+            return None
+        with open(path, "rb") as fh:
+            fh.seek(known["bytes"] - 1)
+            if fh.read(1) != b"\n":
+                return None
+        offsets[name] = known["bytes"]
+    return offsets
+
+
+def read_appended(offsets, data_dir=DATA_DIR):
+    """``read_raw`` for only the rows past ``offsets`` (header kept)."""
+    sources = []
+    for name in DATA_FILES:
+        with open(os.path.join(data_dir, name), "rb") as fh:
+            header = fh.readline()
+            fh.seek(offsets[name])
+            sources.append(io.BytesIO(header + fh.read()))
+    return parse_sources(sources, data_dir)
+
+
+def _concat(frames):
+    """``pd.concat`` after widening categoricals to one sorted category set."""
+    frames = list(frames)
+    for column in frames[0].columns:
+        dtypes = [frame[column].dtype for frame in frames]
+        if not isinstance(dtypes[0], pd.CategoricalDtype):
+            continue
+        if all(dtype.categories.equals(dtypes[0].categories) for dtype in dtypes):
+            continue
+        names  = dtypes[0].categories
+        for other in dtypes[1:]:
+            names = names.union(other.categories)
+        dtype  = pd.CategoricalDtype(names.sort_values())
+        frames = [frame.assign(**{column: frame[column].astype(dtype)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _unify(a, b):
+    """Shared categorical dtype of ``a`` and ``b`` and each one's codes on it.
+
+    The dtype is ``a``'s when both have the same categories or ``a``'s are
+    sorted and cover ``b``'s (the common case of appended rows), else the
+    sorted union of both, as ``_concat`` would build.
+    """
+    def codes(values):
+        return np.asarray(values.codes if isinstance(values, pd.Index) else values.cat.codes)
+
+    old, new = a.dtype.categories, b.dtype.categories
+    if old is not new and not old.equals(new):
+        mapping = old.get_indexer(new)
+        if (mapping < 0).any() or not old.is_monotonic_increasing:
+            dtype = pd.CategoricalDtype(old.union(new).sort_values())
+            union = dtype.categories
+            return (dtype, _recode(codes(a), union.get_indexer(old)),
+                    _recode(codes(b), union.get_indexer(new)))
+        return a.dtype, codes(a), _recode(codes(b), mapping)
+    return a.dtype, codes(a), codes(b)
+
+
+def _recode(codes, mapping):
+    """``codes`` through ``mapping`` (old code -> new code), missing kept."""
+    if np.array_equal(mapping, np.arange(len(mapping))):
+        return codes
+    return np.r_[mapping, -1][codes]
+
+
+def _insert(table, rows, at):
+    """``table`` with ``rows`` inserted in front of its rows at positions ``at``.
+
+    ``at`` is non-decreasing, ``len(table)`` meaning the end. Each column is
+    written once into its place (categoricals through their codes) instead
+    of being concatenated and then sorted.
+    """
+    n, m = len(table), len(rows)
+    new  = np.asarray(at, dtype=np.int64) + np.arange(m)
+    old  = np.ones(n + m, dtype=bool)
+    old[new] = False
+
+    def place(a, b):
+        out = np.empty(n + m, dtype=np.result_type(a, b))
+        out[old], out[new] = a, b
+        return out
+
+    def column(a, b):
+        if isinstance(a.dtype, pd.CategoricalDtype):
+            dtype, a, b = _unify(a, b)
+            return pd.Categorical.from_codes(place(a, b), dtype=dtype)
+        if isinstance(a.dtype, np.dtype) and a.dtype == b.dtype:
+            return place(a.to_numpy(), b.to_numpy())
+        order = place(np.arange(n), np.arange(n, n + m))   # extension dtypes
+        return pd.concat([pd.Series(a), pd.Series(b)], ignore_index=True).take(order).array
+
+    data  = {name: column(table[name], rows[name]) for name in table.columns}
+    index = pd.Index(column(table.index, rows.index), name=table.index.name)
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+def _team_codes(table, rows):
+    """Codes of ``table``'s and ``rows``' team index on one shared dtype."""
+    dtype, old, new = _unify(table.index, rows.index)
+    return old, new, len(dtype.categories)
+
+
+def _append_long(table, rows):
+    """Team-indexed ``rows`` inserted after ``table``'s rows of the same team.
+
+    Both are sorted by team, so each new row's place is a binary search on
+    the cached team codes rather than a sort of the combined table.
+    """
+    old, new, _ = _team_codes(table, rows)
+    return _insert(table, rows, np.searchsorted(old, new, side="right"))
+
+
+def _shared_codes(a, b):
+    """Codes of columns ``a`` and ``b`` on one shared order, and its size.
+
+    Codes follow a sorted groupby's order (categories by code, numbers and
+    text by value) with missing values last.
+    """
+    if isinstance(a.dtype, pd.CategoricalDtype):
+        dtype, a_codes, b_codes = _unify(a, b)
+        codes, size = np.r_[a_codes, b_codes], len(dtype.categories)
+    elif pd.api.types.is_integer_dtype(a.dtype):
+        codes = np.r_[a.to_numpy(np.int64), b.to_numpy(np.int64)]
+        low   = codes.min() if len(codes) else 0
+        codes, size = codes - low, int(codes.max() - low) + 1 if len(codes) else 0
+    else:
+        codes, uniques = pd.factorize(pd.concat([a, b], ignore_index=True), sort=True)
+        size = len(uniques)
+    codes = np.where(codes < 0, size, codes).astype(np.int64)
+    return codes[:len(a)], codes[len(a):], size + 1
+
+
+def _merge_aggregate(name, cached, delta):
+    """``cached`` cells of aggregate ``name`` with the ``delta`` cells folded in.
+
+    Only the cached rows of the teams in ``delta`` are compared: a delta
+    cell whose group is cached updates that row, and new groups are
+    inserted where a full groupby would put them (in key order, or at the
+    end of their team for the unordered scorer cells).
+    """
+    keys, agg, ordered = AGGREGATES[name]
+    team, delta_team, team_size = _team_codes(cached, delta)
+    teams = np.unique(delta_team)
+    lo, hi = np.searchsorted(team, teams, side="left"), np.searchsorted(team, teams, side="right")
+    rows  = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)] + [np.zeros(0, np.int64)])
+    block_end = np.searchsorted(team, delta_team, side="right")
+
+    # One int64 per cell, ordered like the groupby: team, then ``keys``.
+    old, new, span = team[rows].astype(np.int64), delta_team.astype(np.int64), team_size
+    candidates = cached.iloc[rows]
+    for key in keys:
+        a, b, size = _shared_codes(candidates[key], delta[key])
+        span *= size
+        if span >= 2 ** 63:   # too many distinct keys to pack: regroup everything
+            both = _concat([cached.reset_index(), delta.reset_index()])
+            merged = (both.groupby(["team"] + keys, observed=True, sort=ordered, dropna=False)
+                          .agg(agg).astype(np.int32).reset_index(level=keys))
+            return merged if ordered else merged.sort_index(kind="stable")
+        old, new = old * size + a, new * size + b
+
+    sorter = np.arange(len(old)) if ordered else np.argsort(old, kind="stable")
+    pos = np.searchsorted(old[sorter], new)
+    hit = pos < len(old)
+    hit[hit] = old[sorter[pos[hit]]] == new[hit]
+    target = rows[sorter[pos[hit]]]
+    updated = {}
+    for column, how in agg.items():
+        values = cached[column].to_numpy(np.int32, copy=True)
+        change = values[target], delta[column].to_numpy(np.int32)[hit]
+        values[target] = np.minimum(*change) if how == "min" else np.add(*change)
+        updated[column] = values
+
+    at = block_end[~hit]
+    if ordered:
+        # In front of the first cached cell of the same team with a larger key.
+        inside = pos[~hit] < len(old)
+        first  = rows[np.minimum(pos[~hit], len(old) - 1)] if len(old) else at
+        at = np.where(inside & (team[first] == delta_team[~hit]), first, at)
+    return _insert(cached.assign(**updated), delta[~hit], at)
+
+
+def merge_appended(tables, results, goalscorers, shootouts, first_id):
+    """Fold appended source rows into preprocessed ``tables``.
+
+    ``first_id`` is the number of results rows already in ``tables``. Returns
+    None when the rows might change history: matches or goals dated before
+    the cached ones, or a shootout that could belong to a cached match.
+    """
+    matches, goals = tables["matches"], tables["goals"]
+    last = matches["date"].max()
+    if len(results) and results["date"].min() < last:
+        return None
+    if len(goalscorers) and goalscorers["date"].min() < goals["date"].max():
+        return None
+    if len(shootouts) and shootouts["date"].min() <= last:
+        return None
+
+    with profiling.stage("load:elo"):
+        ratings, state = rate(results, tables["elo_state"]["rating"])
+    with profiling.stage("load:preprocess"):
+        new_matches = with_form_after(matches, long_matches(
+            join_shootouts(results, shootouts).join(ratings), first_id))
+        all_matches = _append_long(matches, new_matches)
+        # Appended goals may belong to the last cached day's matches.
+        recent      = all_matches[all_matches["date"] >= goalscorers["date"].min()]
+        new_goals   = long_goals(goalscorers, recent)
+        merged = {
+            "matches":   all_matches,
+            "goals":     _append_long(goals, new_goals),
+            "elo_state": ratings_table(state),
+        }
+        delta = {"cells":        cube_cells(new_matches),
+                 "scorer_cells": scorer_cells(new_goals),
+                 "h2h_cells":    h2h_cells(new_matches),
+                 "timing_cells": timing_cells(new_goals)}
+        for name, rows in delta.items():
+            merged[name] = _merge_aggregate(name, tables[name], rows)
+    return merged
+
+
+def ingest_appended(data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Tables for ``data_dir`` built from a cache entry plus appended rows.
+
+    None when no entry in ``cache_dir`` describes a prefix of the current
+    files, in which case the caller rebuilds from scratch.
+    """
+    try:
+        entries = sorted(os.listdir(cache_dir))
+    except OSError:
+        return None
+    for old in entries:
+        entry = os.path.join(cache_dir, old)
+        try:
+            with open(os.path.join(entry, MANIFEST)) as fh:
+                manifest = json.load(fh)
+            if manifest.get("slice") is not None:
+                continue
+            offsets = appended_offsets(manifest, data_dir)
+            if offsets is None:
+                continue
+            tables = read_tables(entry, TABLES)
+        except (OSError, ValueError, KeyError):
+            continue
+        first_id = len(tables["matches"]) // 2   # two perspectives per result
+        return merge_appended(tables, *read_appended(offsets, data_dir), first_id)
+    return None
+
+
+# ── Dataset ───────────────────────────────────────────────────────────────────
+class Dataset:
+    """The preprocessed tables for one data fingerprint (``token``).
+
+    A dataset loaded for a slice of ``teams`` keeps them as ``focus``;
+    ``teams()`` then lists only those, since their opponents' records are
+    partial.
+    """
+
+    def __init__(self, tables, token, focus=None):
+        self.tables  = tables
+        self.token   = token
+        self.focus   = None if focus is None else frozenset(focus)
+        self.cube    = AggregateCube(tables["cells"])
+        self.scorers = ScorerIndex(tables["scorer_cells"])
+        self.h2h     = HeadToHead(tables["h2h_cells"])
+        self.timing  = TimingIndex(tables["timing_cells"])
+        self._memory_mb = None
+        self._streaks   = {}
+
+    @classmethod
+    def load(cls, data_dir=DATA_DIR, cache_dir=CACHE_DIR, teams=None, tournaments=None):
+        """The dataset, or with ``teams``/``tournaments`` just that slice of it."""
+        with profiling.stage("load:fingerprint"):
+            token = fingerprint(data_dir)
+        tables = load_tables(data_dir, cache_dir, token, teams, tournaments)
+        if teams is not None or tournaments is not None:
+            token = f"{token}-{slice_key(teams, tournaments)}"
+        return cls(tables, token, teams)
+
+    def memory_mb(self):
+        """Deep memory use of each table in MB, measured once."""
+        if self._memory_mb is None:
+            self._memory_mb = profiling.frame_mb(self.tables)
+        return self._memory_mb
+
+    def teams(self):
+        names = team_names(self.tables["matches"])
+        return names if self.focus is None else [name for name in names if name in self.focus]
+
+    def matches(self, team):
+        return team_slice(self.tables["matches"], team)
+
+    def goals(self, team):
+        return team_slice(self.tables["goals"], team)
+
+    def ratings(self):
+        """Current Elo rating of every team (the state after the last match)."""
+        return self.tables["elo_state"]["rating"]
+
+    def streaks(self, run):
+        """Every team's longest ``run`` ("unbeaten" or "winning"), longest first."""
+        if run not in self._streaks:
+            self._streaks[run] = longest_runs(self.tables["matches"], run)
+        return self._streaks[run]
+
+    def shootouts(self, team):
+        matches = self.matches(team)
+        return matches[matches["shootout"].to_numpy()]
@@ -0,0 +1,109 @@
+"""Lightweight per-rerun timing for the dashboard's hot paths.
+
+``stage(name)`` times a block into the profile active on the current thread.
+With no active profile it returns a shared no-op context manager, so the
+instrumentation left in the pipeline, chart and app code costs one
+ContextVar lookup when profiling is off. app.py opens a profile per rerun
+when debugging is enabled and renders it in a sidebar panel; finished
+profiles are also logged as JSON lines on the ``dashboard.profile`` logger
+and kept in a short in-memory history for export.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger("dashboard.profile")
+
+_active  = contextvars.ContextVar("dashboard_profile", default=None)
+_noop    = contextlib.nullcontext()
+_history = deque(maxlen=50)
+_history_lock = threading.Lock()
+
+
+class Profile:
+    """Stage timings and extra facts collected during one rerun."""
+
+    def __init__(self, label):
+        self.label   = label
+        self.started = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        self.stages  = []
+        self.info    = {}
+        self.wall_ms = None
+        self.token   = None
+        self._start  = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, (time.perf_counter() - start) * 1e3))
+
+    def to_dict(self):
+        return {
+            "label":   self.label,
+            "started": self.started,
+            "wall_ms": self.wall_ms,
+            "stages":  [{"name": name, "ms": round(ms, 3)} for name, ms in self.stages],
+            **self.info,
+        }
+
+
+def stage(name):
+    """Time the enclosed block into the active profile, if there is one."""
+    profile = _active.get()
+    return _noop if profile is None else profile.stage(name)
+
+
+def active():
+    """The profile open on the current thread, or None."""
+    return _active.get()
+
+
+def start(label="rerun"):
+    """Open a profile for the current thread and return it."""
+    profile = Profile(label)
+    profile.token = _active.set(profile)
+    return profile
+
+
+def finish(profile, **info):
+    """Close ``profile``, attach ``info``, log it and add it to the history."""
+    profile.wall_ms = round((time.perf_counter() - profile._start) * 1e3, 3)
+    profile.info.update(info)
+    _active.reset(profile.token)
+    record = profile.to_dict()
+    logger.info(json.dumps(record, default=str))
+    with _history_lock:
+        _history.append(record)
+    return record
+
+
+def history():
+    """Recently finished profiles, oldest first."""
+    with _history_lock:
+        return list(_history)
+
+
+def rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if os.uname().sysname == "Darwin" else peak / 2**10
+
+
+def frame_mb(frames):
+    """Deep memory use in MB of each DataFrame in ``frames`` (a dict)."""
+    return {name: round(frame.memory_usage(deep=True).sum() / 2**20, 2)
+            for name, frame in frames.items()}
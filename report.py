@@ -0,0 +1,202 @@
+"""Headless report generator: the dashboard's figures for many teams, as files.
+
+Builds the same figures as app.py through ``charts`` and the data pipeline,
+without Streamlit, for every team and filter preset, and writes one HTML page
+and/or one JSON document per (team, preset):
+
+    python report.py [--teams Argentina Brazil] [--presets default all]
+                     [--format html json] [--out reports] [--workers 4]
+
+The preprocessed dataset is loaded once in the parent process. Teams are
+spread over a process pool; forked workers inherit the parent's dataset,
+and spawned ones (macOS, Windows) map the on-disk cache the parent has
+just written rather than re-parsing the CSVs.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+
+import charts
+from filters import default_filters
+from pipeline import CACHE_DIR, DATA_DIR, Dataset
+
+# (name, builder, whether the builder takes the preset's filters)
+FIGURES = [
+    ("waterfall",   charts.waterfall,    False),
+    ("pyramid",     charts.pyramid,      False),
+    ("radar",       charts.radar,        True),
+    ("top_scorers", charts.top_scorers,  True),
+    ("scatter_3d",  charts.scatter_3d,   True),
+    ("rivals",      charts.rivals,       True),
+    ("shootouts",   charts.shootout_pie, False),
+]
+
+# Filter presets: "default" is the dashboard's initial sidebar state, "all"
+# every year and tournament, and one preset per era of ``charts.ERAS`` with
+# the major tournaments.
+ERA_PRESETS = {re.sub(r"\W+", "_", name.split(" (")[0]).strip("_").lower(): years
+               for name, years in charts.ERAS.items()}
+PRESETS = ["default", "all"] + list(ERA_PRESETS)
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>body {{ background: #0e1117; color: #cccccc; font-family: sans-serif; }}</style>
+</head><body>
+<h1>{title}</h1>
+<p>{subtitle}</p>
+{figures}
+</body></html>
+"""
+
+_dataset = None
+
+
+def slug(name):
+    return re.sub(r"\W+", "_", name).strip("_")
+
+
+def preset_filters(ds, team, preset):
+    """``(year_range, tournaments)`` of ``preset`` for ``team``."""
+    matches = ds.matches(team)
+    years, year_range, tournaments = default_filters(matches, charts.MAJOR_TOURNAMENTS)
+    if preset == "all":
+        return years, sorted(matches["tournament"].unique())
+    if preset in ERA_PRESETS:
+        return ERA_PRESETS[preset], tournaments
+    return year_range, tournaments
+
+
+def build_figures(ds, team, year_range, tournaments, specs):
+    """Every figure in ``FIGURES`` for one team and filter selection, as dicts.
+
+    Figures are converted to plain dicts once (the costly part of rendering)
+    and kept in ``specs`` by builder parameters, so presets and formats that
+    share a figure reuse its dict.
+    """
+    figures = {}
+    for name, builder, filtered in FIGURES:
+        params = {"team": team}
+        if filtered:
+            params["year_range"] = tuple(year_range)
+            if builder is not charts.top_scorers:
+                params["tournaments"] = tuple(sorted(tournaments))
+        key = (name, tuple(params.values()))
+        if key not in specs:   # bypass the figure cache: each figure is built once here
+            specs[key] = builder.__wrapped__(ds, **params).to_dict()
+        figures[name] = specs[key]
+    return figures
+
+
+def render_html(team, preset, year_range, tournaments, figures):
+    parts = [pio.to_html(spec, full_html=False, include_plotlyjs="cdn" if i == 0 else False,
+                         div_id=name, validate=False)
+             for i, (name, spec) in enumerate(figures.items())]
+    return PAGE.format(title=f"{team} — {preset}",
+                       subtitle=f"{year_range[0]}–{year_range[1]} · {', '.join(tournaments)}",
+                       figures="\n".join(parts))
+
+
+def render_json(team, preset, year_range, tournaments, figures):
+    specs = ", ".join(f'"{name}": {pio.to_json(spec, validate=False)}'
+                      for name, spec in figures.items())
+    header = json.dumps({"team": team, "preset": preset, "year_range": list(year_range),
+                         "tournaments": list(tournaments)})
+    return f'{header[:-1]}, "figures": {{{specs}}}}}'
+
+
+RENDERERS = {"html": render_html, "json": render_json}
+
+
+def report_team(team, presets, formats, out_dir):
+    """Write every preset of one team; returns ``(team, files, seconds)``."""
+    start = time.perf_counter()
+    team_dir = os.path.join(out_dir, slug(team))
+    os.makedirs(team_dir, exist_ok=True)
+    specs, files = {}, 0
+    for preset in presets:
+        year_range, tournaments = preset_filters(_dataset, team, preset)
+        figures = build_figures(_dataset, team, year_range, tournaments, specs)
+        for fmt in formats:
+            text = RENDERERS[fmt](team, preset, year_range, tournaments, figures)
+            with open(os.path.join(team_dir, f"{preset}.{fmt}"), "w", encoding="utf-8") as fh:
+                fh.write(text)
+            files += 1
+    return team, files, time.perf_counter() - start
+
+
+def _init_worker(data_dir, cache_dir):
+    global _dataset
+    if _dataset is None:   # spawned rather than forked
+        _dataset = Dataset.load(data_dir, cache_dir)
+
+
+def run(teams=None, presets=PRESETS, formats=("html",), out_dir="reports", workers=None,
+        data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Write reports for ``teams`` (default: all) and return a summary dict."""
+    global _dataset
+    start = time.perf_counter()
+    _dataset = Dataset.load(data_dir, cache_dir)
+    teams = list(teams or _dataset.teams())
+    unknown = sorted(set(teams) - set(_dataset.teams()))
+    if unknown:
+        raise SystemExit(f"unknown teams: {', '.join(unknown)}")
+    loaded = time.perf_counter() - start
+
+    workers = workers or os.cpu_count() or 1
+    timings, written = {}, 0
+    if workers == 1:
+        for team, files, seconds in (report_team(team, presets, formats, out_dir)
+                                     for team in teams):
+            timings[team] = round(seconds, 3)
+            written += files
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(data_dir, cache_dir)) as pool:
+            jobs = [pool.submit(report_team, team, presets, formats, out_dir) for team in teams]
+            for job in jobs:
+                team, files, seconds = job.result()
+                timings[team] = round(seconds, 3)
+                written += files
+
+    summary = {
+        "teams":      len(teams),
+        "presets":    list(presets),
+        "formats":    list(formats),
+        "files":      written,
+        "workers":    workers,
+        "load_s":     round(loaded, 3),
+        "total_s":    round(time.perf_counter() - start, 3),
+        "per_team_s": timings,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "index.json"), "w") as fh:
+        json.dump(summary, fh, indent=2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", nargs="+", help="team names (default: every team)")
+    parser.add_argument("--presets", nargs="+", choices=PRESETS, default=PRESETS)
+    parser.add_argument("--format", nargs="+", choices=list(RENDERERS), default=["html"],
+                        dest="formats")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    summary = run(args.teams, args.presets, args.formats, args.out, args.workers)
+    print(f"{summary['teams']} teams x {len(summary['presets'])} presets in "
+          f"{summary['total_s']:.1f}s ({summary['workers']} workers, "
+          f"data loaded in {summary['load_s']:.1f}s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
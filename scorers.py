@@ -0,0 +1,70 @@
+"""Per-team scorer index behind the top scorers chart.
+
+``scorer_cells`` reduces the long goals table to one row per
+(team, scorer, year) with the number of goals, own goals excluded; it is
+cached with the other tables. ``ScorerIndex`` expands a team's cells into a
+dense (year, scorer) array prefix-summed over years, as ``cube.AggregateCube``
+does for match measures, so the top k of any year range is a partial
+selection over one vector.
+"""
+import numpy as np
+import pandas as pd
+
+from cube import TeamIndex, year_range
+
+
+def scorer_cells(goals):
+    """One row per (team, scorer, year) with ``goals``, own goals excluded.
+
+    Within a team, scorers appear in order of their first goal, which is the
+    tie-break order of the top scorers chart.
+    """
+    scored = goals[~goals["own_goal"].to_numpy()]
+    frame = pd.DataFrame({
+        "team":   scored.index,
+        "scorer": scored["scorer"].to_numpy(),
+        "year":   scored["year"].to_numpy(),
+    })
+    cells = (frame.groupby(["team", "scorer", "year"], observed=True, sort=False)
+                  .size().rename("goals").astype(np.int32).reset_index())
+    return cells.set_index("team").sort_index(kind="stable")
+
+
+class TeamScorers:
+    """Prefix-summed (year, scorer) goal counts for one team."""
+
+    def __init__(self, cells):
+        self.scorers, scorer_idx = np.unique(cells["scorer"].astype(str).to_numpy(),
+                                             return_inverse=True)
+        # np.unique sorts by name; rank scorers by first goal instead.
+        first = np.full(len(self.scorers), len(cells))
+        np.minimum.at(first, scorer_idx, np.arange(len(cells)))
+        self.rank  = np.argsort(np.argsort(first, kind="stable"), kind="stable")
+        self.years, year_idx = np.unique(cells["year"].to_numpy(), return_inverse=True)
+        dense = np.zeros((len(self.years) + 1, len(self.scorers)), dtype=np.int32)
+        dense[year_idx + 1, scorer_idx] = cells["goals"].to_numpy()
+        self.prefix = dense.cumsum(axis=0, dtype=np.int32)
+
+    def goals(self, first=None, last=None):
+        """Goals of every scorer (in ``scorers`` order) in years ``first..last``."""
+        lo, hi = year_range(self.years, first, last)
+        return self.prefix[hi] - self.prefix[lo]
+
+    def top(self, k, first=None, last=None):
+        """The ``k`` leading scorers in years ``first..last`` as a Scorer/Goals frame.
+
+        Most goals first; ties go to the scorer who scored first.
+        """
+        goals = self.goals(first, last)
+        # One distinct integer key per scorer: goals, then earlier first goal.
+        key  = goals.astype(np.int64) * len(goals) + (len(goals) - 1 - self.rank)
+        live = np.flatnonzero(goals)
+        if len(live) > k:
+            live = live[np.argpartition(key[live], len(live) - k)[len(live) - k:]]
+        best = live[np.argsort(-key[live])]
+        return pd.DataFrame({"Scorer": self.scorers[best], "Goals": goals[best]})
+
+
+class ScorerIndex(TeamIndex):
+    """``TeamScorers`` per team."""
+    per_team = TeamScorers
@@ -0,0 +1,87 @@
+"""Preprocessed tables as memory-mapped column files.
+
+Each table is a directory with one ``.npy`` file per column (categoricals
+as their integer codes, nullable integers as values plus mask) and a
+``meta.json`` holding column order, kinds and category labels. ``read_tables``
+maps every file read-only and wraps the arrays in pandas objects without
+copying, so all processes that load the same cache entry share one copy of
+the data in the OS page cache, and nothing a session does can modify it.
+String columns that are not categorical are the exception: they are small
+here and are read into memory.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+META = "meta.json"
+
+
+def _save_column(folder, position, values):
+    """Write one column (or the index) and return its ``meta.json`` entry."""
+    path  = os.path.join(folder, f"{position}.npy")
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = values.codes if isinstance(values, pd.Index) else values.cat.codes
+        np.save(path, np.asarray(codes))
+        return {"kind": "category", "categories": dtype.categories.tolist(),
+                "ordered": bool(dtype.ordered)}
+    if isinstance(values.array, pd.arrays.IntegerArray):
+        np.save(path, values.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        np.save(os.path.join(folder, f"{position}.mask.npy"), values.isna().to_numpy())
+        return {"kind": "masked"}
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufM":
+        np.save(path, values.to_numpy())
+        return {"kind": "array"}
+    np.save(path, np.asarray(values, dtype=str))
+    return {"kind": "str"}
+
+
+def _map(path):
+    try:
+        return np.load(path, mmap_mode="r").view(np.ndarray)   # plain, read-only view
+    except ValueError:   # zero-length arrays cannot be mapped
+        return np.load(path)
+
+
+def _load_column(folder, position, spec):
+    values = _map(os.path.join(folder, f"{position}.npy"))
+    if spec["kind"] == "category":
+        dtype = pd.CategoricalDtype(spec["categories"], ordered=spec["ordered"])
+        return pd.Categorical.from_codes(values, dtype=dtype)
+    if spec["kind"] == "masked":
+        mask = _map(os.path.join(folder, f"{position}.mask.npy"))
+        return pd.arrays.IntegerArray(values, mask, copy=False)
+    if spec["kind"] == "str":
+        return pd.array(values, dtype="str")
+    return values
+
+
+def write_tables(tables, directory):
+    """Write each frame of ``tables`` to ``directory/<name>/``."""
+    for name, table in tables.items():
+        folder = os.path.join(directory, name)
+        os.makedirs(folder, exist_ok=True)
+        columns = [table.index] + [table[column] for column in table.columns]
+        meta = {
+            "index":   table.index.name,
+            "columns": table.columns.tolist(),
+            "specs":   [_save_column(folder, i, values) for i, values in enumerate(columns)],
+        }
+        with open(os.path.join(folder, META), "w") as fh:
+            json.dump(meta, fh)
+
+
+def read_tables(directory, names):
+    """Map the frames ``names`` written by ``write_tables`` back, read-only."""
+    tables = {}
+    for name in names:
+        folder = os.path.join(directory, name)
+        with open(os.path.join(folder, META)) as fh:
+            meta = json.load(fh)
+        parts = [_load_column(folder, i, spec) for i, spec in enumerate(meta["specs"])]
+        index = pd.Index(parts[0], name=meta["index"], copy=False)
+        tables[name] = pd.DataFrame(dict(zip(meta["columns"], parts[1:])), index=index,
+                                    copy=False)
+    return tables
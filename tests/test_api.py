@@ -0,0 +1,59 @@
+import pytest
+
+from api import Client, QueryAPI
+from pipeline import Dataset
+
+
+@pytest.fixture(scope="module")
+def client():
+    return Client(QueryAPI(Dataset.load()))
+
+
+def test_kpis(client):
+    response = client.get("/kpis?team=Argentina&from=1978&to=2022&tournament=FIFA+World+Cup")
+    assert response.status == 200
+    body = response.json()
+    assert body["matches"] == body["wins"] + body["draws"] + body["losses"] > 0
+
+
+def test_etag_round_trip(client):
+    first = client.get("/h2h?team=Brazil&limit=5")
+    again = client.get("/h2h?team=Brazil&limit=5", headers={"If-None-Match": first.headers["ETag"]})
+    assert first.status == 200 and len(first.json()) == 5
+    assert again.status == 304 and again.body == b""
+
+
+@pytest.mark.parametrize("path, status", [
+    ("/kpis", 400),
+    ("/kpis?team=Atlantis", 404),
+    ("/kpis?team=Brazil&from=2000&to=1990", 400),
+    ("/nope?team=Brazil", 404),
+])
+def test_bad_queries(client, path, status):
+    response = client.get(path)
+    assert response.status == status
+    assert "error" in response.json()
+
+
+@pytest.mark.parametrize("entry, status", [
+    ({"query": ["kpis"], "team": "Brazil"}, 404),
+    ({"query": {"kpis": 1}, "team": "Brazil"}, 404),
+    ({"query": "kpis", "team": "Brazil", "tournaments": {"FIFA World Cup": 1}}, 400),
+    ({"query": "kpis", "team": "Brazil", "tournaments": 7}, 400),
+    ({"query": "kpis", "team": "Brazil", "tournaments": "FIFA World Cup"}, 400),
+    ({"query": "kpis", "team": "Brazil", "from": True}, 400),
+    ({"query": "kpis", "team": "Brazil", "from": 1999.7}, 400),
+    ({"query": "h2h", "team": "Brazil", "limit": False}, 400),
+])
+def test_malformed_batch_entries_fail_alone(client, entry, status):
+    response = client.post("/batch", {"queries": [entry, {"query": "kpis", "team": "Brazil"}]})
+    assert response.status == 200
+    bad, good = response.json()["results"]
+    assert bad["status"] == status and "error" in bad
+    assert good["status"] == 200 and good["data"]["matches"] > 0
+
+
+def test_integral_json_numbers_are_accepted(client):
+    response = client.post("/batch", {"queries": [
+        {"query": "kpis", "team": "Brazil", "from": 1999.0, "to": 2002}]})
+    assert response.json()["results"][0]["status"] == 200
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+import elo
+import pipeline
+
+
+@pytest.fixture(scope="module")
+def results():
+    return pipeline.read_raw()[0]
+
+
+@pytest.mark.parametrize("cut", ["1950-01-01", "2015-07-01"])
+def test_rate_from_state_matches_full_history(results, cut):
+    full_ratings, full_state = elo.rate(results)
+    before = (results["date"] < cut).to_numpy()
+
+    _, state = elo.rate(results[before])
+    ratings, state = elo.rate(results[~before], state)
+
+    pd.testing.assert_frame_equal(ratings, full_ratings[~before], check_exact=True)
+    pd.testing.assert_series_equal(state, full_state, check_exact=True)
+
+
+def test_rate_starts_new_teams_at_base_rating(results):
+    _, state = elo.rate(results[(results["date"] < "2000-01-01").to_numpy()])
+    debut = results[(results["date"] >= "2000-01-01").to_numpy()]
+    debut = debut[~debut["home_team"].isin(state.index).to_numpy()].head(1)
+
+    ratings, _ = elo.rate(debut, state)
+
+    assert ratings["home_elo"].iloc[0] == elo.BASE_RATING
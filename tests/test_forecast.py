@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecast
+
+BRACKET = ["A", "B", "C", "D"]
+
+
+@pytest.fixture
+def model():
+    teams = pd.Index(BRACKET)
+    return forecast.PoissonModel(teams, np.array([1.4, 1.0, 0.9, 0.7]),
+                                 np.array([0.8, 1.0, 1.1, 1.2]), base=1.3, home=1.1)
+
+
+def test_simulate_probabilities(model):
+    odds = forecast.simulate(model, BRACKET, runs=2_000, seed=1)
+    assert list(odds.columns) == ["Last 4", "Last 2", "Champion"]
+    assert (odds["Last 4"] == 1).all()
+    assert odds["Last 2"].sum() == pytest.approx(2)
+    assert odds["Champion"].sum() == pytest.approx(1)
+    assert odds["Champion"].idxmax() == "A"
+
+
+def test_simulate_same_seed_same_result(model):
+    first  = forecast.simulate(model, BRACKET, runs=30_000, seed=7)
+    second = forecast.simulate(model, BRACKET, runs=30_000, seed=7)
+    pd.testing.assert_frame_equal(first, second)
+
+
+@pytest.mark.parametrize("runs", [0, -5])
+def test_simulate_rejects_runs_below_one(model, runs):
+    with pytest.raises(ValueError, match="runs"):
+        forecast.simulate(model, BRACKET, runs=runs)
+
+
+def test_simulate_rejects_workers_below_one(model):
+    with pytest.raises(ValueError, match="workers"):
+        forecast.simulate(model, BRACKET, runs=10, workers=0)
+
+
+@pytest.mark.parametrize("bracket", [["A"], ["A", "B", "C"]])
+def test_simulate_rejects_bracket_sizes(model, bracket):
+    with pytest.raises(ValueError, match="power-of-two"):
+        forecast.simulate(model, bracket, runs=10)
+
+
+def test_simulate_rejects_unknown_teams(model):
+    with pytest.raises(ValueError, match="Atlantis"):
+        forecast.simulate(model, ["A", "Atlantis"], runs=10)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import form
+
+
+def long_table(teams, scored, conceded):
+    index = pd.CategoricalIndex(teams, categories=sorted(set(teams)), name="team")
+    return pd.DataFrame({"scored": scored, "conceded": conceded}, index=index)
+
+
+def test_form_columns_per_team_window():
+    matches = long_table(["X"] * 6 + ["Y"] * 2,
+                         [1, 2, 1, 0, 2, 3, 0, 2],
+                         [0, 0, 1, 1, 1, 0, 1, 0])
+
+    columns = form.form_columns(matches, window=3)
+
+    np.testing.assert_allclose(columns["form_ppg"], [3, 3, 7 / 3, 4 / 3, 4 / 3, 2, 0, 1.5],
+                               rtol=1e-6)
+    assert columns["form_gd"].tolist() == [1, 3, 3, 1, 0, 3, -1, 1]
+    assert columns["unbeaten_run"].tolist() == [1, 2, 3, 0, 1, 2, 0, 1]
+    assert columns["winning_run"].tolist() == [1, 2, 0, 0, 1, 2, 0, 1]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_with_form_after_matches_full_recompute(seed):
+    rng = np.random.default_rng(seed)
+    # "A" never loses, so its runs outgrow the window and cross the cut;
+    # "E" has no appended rows and "F" only appended ones.
+    counts = {"A": 40, "B": 35, "C": 30, "D": 25, "E": 20, "F": 15}
+    teams  = np.repeat(list(counts), list(counts.values()))
+    scored = rng.integers(0, 4, len(teams))
+    conceded = np.where(teams == "A", 0, rng.integers(0, 4, len(teams)))
+    full = long_table(teams, scored, conceded).assign(id=np.arange(len(teams)))
+    position = full.groupby(level="team", observed=True).cumcount().to_numpy()
+    cut = dict(zip(counts, rng.integers(5, 20, len(counts))), E=counts["E"], F=0)
+    appended = position >= np.vectorize(cut.get)(teams)
+
+    history = form.with_form(full[~appended])
+    rows    = full[appended].iloc[np.argsort(position[appended], kind="stable")]
+    merged  = form.with_form_after(history, rows, window=form.FORM_WINDOW)
+
+    expected = form.with_form(full).set_index("id").loc[merged["id"]]
+    for name in form.FORM_COLUMNS:
+        np.testing.assert_array_equal(merged[name].to_numpy(), expected[name].to_numpy(),
+                                      err_msg=name)
@@ -0,0 +1,170 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import pipeline
+
+
+def split_sources(data_dir, fraction):
+    """Copy the CSVs into ``data_dir`` cut before the first match on or after
+    the date ``fraction`` of the way through the results; returns the rest.
+
+    Files are split as bytes, so line endings (shootouts.csv uses CRLF) are
+    kept exactly.
+    """
+    shutil.copy(os.path.join(pipeline.DATA_DIR, pipeline.NAMES_FILE), data_dir)
+    lines = {}
+    for name in pipeline.DATA_FILES:
+        with open(os.path.join(pipeline.DATA_DIR, name), "rb") as fh:
+            lines[name] = fh.read().splitlines(keepends=True)
+    results = lines["results.csv"]
+    split = results[1 + int((len(results) - 1) * fraction)][:10]
+    rest = {}
+    for name, content in lines.items():
+        cut = next((i for i, line in enumerate(content[1:], 1) if line[:10] >= split),
+                   len(content))
+        with open(os.path.join(data_dir, name), "wb") as fh:
+            fh.writelines(content[:cut])
+        rest[name] = content[cut:]
+    return rest
+
+
+def append_sources(data_dir, rest):
+    for name, content in rest.items():
+        with open(os.path.join(data_dir, name), "ab") as fh:
+            fh.writelines(content)
+
+
+@pytest.mark.parametrize("fraction", [0.5, 0.99])
+def test_ingest_appended_matches_full_rebuild(tmp_path, fraction):
+    data_dir, cache_dir = tmp_path / "data", tmp_path / "cache"
+    data_dir.mkdir()
+    rest = split_sources(data_dir, fraction)
+    pipeline.load_tables(data_dir, cache_dir)
+    append_sources(data_dir, rest)
+
+    merged = pipeline.ingest_appended(data_dir, cache_dir)
+    assert merged is not None
+    full = pipeline.preprocess(*pipeline.read_raw(data_dir))
+    for name in pipeline.TABLES:
+        pd.testing.assert_frame_equal(merged[name], full[name], check_exact=True, obj=name)
+
+
+def test_ingest_appended_needs_unchanged_prefix(tmp_path):
+    data_dir, cache_dir = tmp_path / "data", tmp_path / "cache"
+    data_dir.mkdir()
+    rest = split_sources(data_dir, 0.99)
+    pipeline.load_tables(data_dir, cache_dir)
+    append_sources(data_dir, rest)
+    results = data_dir / "results.csv"
+    results.write_bytes(results.read_bytes().replace(b"Scotland,England,0,0", b"Scotland,England,1,0", 1))
+
+    assert pipeline.ingest_appended(data_dir, cache_dir) is None
+
+
+def test_sliced_load_keeps_the_teams_records(tmp_path):
+    full   = pipeline.Dataset.load(cache_dir=tmp_path)
+    sliced = pipeline.Dataset.load(cache_dir=tmp_path, teams=["Brazil", "Argentina"])
+
+    assert sliced.teams() == ["Argentina", "Brazil"]
+    assert sliced.token != full.token
+    for team in sliced.teams():
+        assert sliced.cube.team(team).totals() == full.cube.team(team).totals()
+        assert len(sliced.goals(team)) == len(full.goals(team))
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted([full.token, sliced.token])
+    # The slice's own entry is reused, whatever the order of the teams.
+    again = pipeline.Dataset.load(cache_dir=tmp_path, teams=["Argentina", "Brazil"])
+    assert again.token == sliced.token
+
+
+def test_failed_cache_write_leaves_no_staging(tmp_path, monkeypatch):
+    def fail(tables, path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pipeline, "write_tables", fail)
+    tables = pipeline.load_tables(cache_dir=tmp_path)
+
+    assert set(tables) == set(pipeline.TABLES)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_write_removes_abandoned_staging(tmp_path):
+    key  = pipeline.fingerprint()
+    dead = tmp_path / f"{key}.tmp{2 ** 22 + 1}"      # above Linux's highest pid
+    old  = tmp_path / f"0123456789abcdef0123.tmp{os.getpid()}"   # a stale entry's
+    live = tmp_path / f"{key}-0123456789ab.tmp{os.getpid()}"     # a live slice writer's
+    for path in (dead, old, live):
+        path.mkdir()
+
+    pipeline.load_tables(cache_dir=tmp_path, key=key)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted([key, live.name])
+
+
+def test_join_shootouts_keeps_first_of_repeated_shootouts(caplog):
+    results = pd.DataFrame({"date": pd.to_datetime(["2000-01-01", "2000-01-02"]),
+                            "home_team": ["A", "B"], "away_team": ["B", "C"]})
+    shootouts = pd.DataFrame({"date": pd.to_datetime(["2000-01-01"] * 2 + ["2000-01-02"]),
+                              "home_team": ["A", "A", "B"], "away_team": ["B", "B", "C"],
+                              "winner": ["A", "B", "C"], "first_shooter": ["B", "A", None]})
+
+    with caplog.at_level("WARNING", logger="dashboard.pipeline"):
+        joined = pipeline.join_shootouts(results, shootouts)
+
+    assert joined["shootout_winner"].tolist() == ["A", "C"]
+    assert joined["first_shooter"].tolist()[0] == "B"
+    assert "1 repeated" in caplog.text
+
+
+def test_resolve_names_only_inside_the_former_name_interval():
+    former = pipeline.read_former_names()
+    names  = pd.Series(["Dahomey", "Dahomey", "Dahomey", "Benin"], dtype="category")
+    dates  = pd.Series(pd.to_datetime(["1960-08-01", "1959-01-01", "1976-01-01", "1980-01-01"]))
+
+    resolved = pipeline.resolve_names(names, dates, former)
+
+    assert resolved.tolist() == ["Benin", "Dahomey", "Dahomey", "Benin"]
+
+
+def test_resolve_former_names_keeps_venue_countries():
+    former  = pipeline.read_former_names()
+    results = pd.DataFrame({"date": pd.to_datetime(["1960-08-01", "1950-01-01"]),
+                            "home_team": ["Dahomey", "Soviet Union"],
+                            "away_team": ["Ghana", "Ireland"],
+                            "country": ["Dahomey", "Soviet Union"]})
+
+    pipeline.resolve_former_names([results], former)
+
+    assert results["home_team"].tolist() == ["Benin", "Russia"]
+    assert results["away_team"].tolist() == ["Ghana", "Northern Ireland"]
+    assert results["country"].tolist() == ["Dahomey", "Soviet Union"]
+
+
+def test_sliced_load_without_matches_is_an_error(tmp_path):
+    with pytest.raises(ValueError, match="no matches"):
+        pipeline.Dataset.load(cache_dir=tmp_path, teams=["Atlantis"])
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stream_csv_keeps_only_the_given_matches():
+    source  = os.path.join(pipeline.DATA_DIR, "goalscorers.csv")
+    matches = pd.MultiIndex.from_tuples([("1930-07-13", "France", "Mexico"),
+                                         ("2022-12-18", "Argentina", "France")],
+                                        names=pipeline.SHOOTOUT_KEYS)
+
+    goals = pipeline.stream_csv(source, "goalscorers.csv", chunksize=10_000, matches=matches)
+
+    assert len(goals) == 5 + 6
+    assert set(zip(goals["date"], goals["home_team"], goals["away_team"])) == set(matches)
+
+
+def test_parse_minutes_stoppage_missing_and_out_of_range():
+    minutes = pd.Series(["45+2", "90+4", " 90 + 1", "17", None, "abc", "-3", "1000", "999"],
+                        dtype="str")
+
+    parsed = pipeline.parse_minutes(minutes)
+
+    assert parsed.dtype == "Int16"
+    assert parsed.tolist() == [45, 90, 90, 17, pd.NA, pd.NA, pd.NA, pd.NA, 999]
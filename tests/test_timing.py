@@ -0,0 +1,22 @@
+import pandas as pd
+
+import pipeline
+import timing
+
+
+def test_minute_buckets_edges():
+    minutes = pd.Series([1, 15, 16, 45, 46, 90, 91, 105, 106, 120, 121, None], dtype="Int16")
+
+    buckets = timing.minute_buckets(minutes)
+
+    assert [timing.BUCKETS[b] for b in buckets] == [
+        "1–15", "1–15", "16–30", "31–45+", "46–60", "76–90+", "91–105", "91–105",
+        "106–120+", "106–120+", "106–120+", "Unknown"]
+
+
+def test_stoppage_time_falls_in_the_period_bucket():
+    minutes = pipeline.parse_minutes(pd.Series(["45+2", "90+4", "", "1000"], dtype="str"))
+
+    buckets = timing.minute_buckets(minutes)
+
+    assert [timing.BUCKETS[b] for b in buckets] == ["31–45+", "76–90+", "Unknown", "Unknown"]
@@ -0,0 +1,23 @@
+import pytest
+
+import warmup
+
+
+def test_dataset_retries_a_failed_load():
+    calls = []
+
+    def load():
+        calls.append(None)
+        if len(calls) < 3:
+            raise OSError("disk not mounted yet")
+        return "dataset"
+
+    warm = warmup.Warmup([], load=load, figures=False)
+    warm.run()
+    assert warm.status()["state"] == "failed"
+
+    with pytest.raises(OSError):
+        warm.dataset()
+    assert warm.dataset() == "dataset"
+    assert warm.dataset() == "dataset"
+    assert len(calls) == 3
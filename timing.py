@@ -0,0 +1,102 @@
+"""Goal-timing histograms behind the goal timing section.
+
+``timing_cells`` reduces the long goals table to one row per
+(team, tournament, year, side, bucket, kind) with a goal count: every goal
+is counted once as scored by its team and once as conceded by the opponent,
+``bucket`` is its minute bucket of ``BUCKETS`` and ``kind`` open play,
+penalty or own goal. The cells are cached with the other tables.
+``TimingIndex`` expands a team's cells into a dense
+(year, tournament, side, bucket, kind) array prefix-summed over years, as
+``cube.AggregateCube`` does for match measures.
+"""
+import numpy as np
+import pandas as pd
+
+from cube import TeamIndex, year_range
+
+SIDES = ("scored", "conceded")
+KINDS = ("open play", "penalty", "own goal")
+
+# Fifteen-minute buckets of regulation time, then the two halves of extra
+# time. The source records stoppage time as the period's last minute (45,
+# 90, ...), so those goals fall in the bucket ending there; goals without
+# a minute get the last bucket.
+BUCKET_ENDS = (15, 30, 45, 60, 75, 90, 105)
+BUCKETS = ("1–15", "16–30", "31–45+", "46–60", "61–75", "76–90+", "91–105", "106–120+",
+           "Unknown")
+UNKNOWN = len(BUCKETS) - 1
+LATE    = slice(5, UNKNOWN)   # from the 76th minute on, extra time included
+
+
+def minute_buckets(minutes):
+    """Bucket index of each minute in ``minutes`` (missing -> ``UNKNOWN``)."""
+    values = minutes.to_numpy(dtype=np.float64, na_value=np.nan)
+    buckets = np.searchsorted(BUCKET_ENDS, values, side="left")
+    return np.where(np.isnan(values), UNKNOWN, buckets).astype(np.int8)
+
+
+def goal_kinds(goals):
+    """``KINDS`` index of each goal: own goal, else penalty, else open play."""
+    own, penalty = goals["own_goal"].to_numpy(bool), goals["penalty"].to_numpy(bool)
+    return np.where(own, 2, np.where(penalty, 1, 0)).astype(np.int8)
+
+
+def timing_cells(goals):
+    """One row per (team, tournament, year, side, bucket, kind) with ``goals``.
+
+    ``goals`` is the long goals table with ``opponent`` and ``tournament``;
+    goals whose match is missing from the results keep a missing tournament.
+    """
+    n = len(goals)
+    frame = pd.DataFrame({
+        "team":       pd.concat([goals.index.to_series(), goals["opponent"]], ignore_index=True),
+        "tournament": pd.concat([goals["tournament"]] * 2, ignore_index=True),
+        "year":       np.tile(goals["year"].to_numpy(), 2),
+        "side":       np.repeat(np.arange(len(SIDES), dtype=np.int8), n),
+        "bucket":     np.tile(minute_buckets(goals["minute"]), 2),
+        "kind":       np.tile(goal_kinds(goals), 2),
+    })
+    keys  = ["team", "tournament", "year", "side", "bucket", "kind"]
+    cells = frame.groupby(keys, observed=True, sort=True, dropna=False).size()
+    return cells.rename("goals").astype(np.int32).reset_index(level=keys[1:])
+
+
+class TeamTiming:
+    """Prefix-summed (year, tournament, side, bucket, kind) goal counts for one team."""
+
+    def __init__(self, cells):
+        self.years, year_idx = np.unique(cells["year"].to_numpy(), return_inverse=True)
+        self.tournaments, tourn_idx = np.unique(cells["tournament"].astype(str).to_numpy(),
+                                                return_inverse=True)
+        dense = np.zeros((len(self.years) + 1, len(self.tournaments), len(SIDES),
+                          len(BUCKETS), len(KINDS)), dtype=np.int32)
+        dense[year_idx + 1, tourn_idx, cells["side"].to_numpy(), cells["bucket"].to_numpy(),
+              cells["kind"].to_numpy()] = cells["goals"].to_numpy()
+        self.prefix = dense.cumsum(axis=0, dtype=np.int32)
+
+    def _keep(self, tournaments):
+        if tournaments is None:
+            return slice(None)
+        return np.isin(self.tournaments, np.asarray(list(tournaments), dtype=str))
+
+    def histogram(self, first=None, last=None, tournaments=None):
+        """(side, bucket, kind) counts over years ``first..last`` and the selection."""
+        lo, hi = year_range(self.years, first, last)
+        return (self.prefix[hi] - self.prefix[lo])[self._keep(tournaments)].sum(axis=0)
+
+    def by_period(self, periods, tournaments=None):
+        """``histogram`` for each ``(first, last)`` of ``periods``, stacked."""
+        bounds = np.array([year_range(self.years, first, last)
+                           for first, last in periods]).reshape(-1, 2)
+        window = self.prefix[bounds[:, 1]] - self.prefix[bounds[:, 0]]
+        return window[:, self._keep(tournaments)].sum(axis=1)
+
+    def by_tournament(self, first=None, last=None):
+        """(tournament, side, bucket, kind) counts in ``first..last``; see ``tournaments``."""
+        lo, hi = year_range(self.years, first, last)
+        return self.prefix[hi] - self.prefix[lo]
+
+
+class TimingIndex(TeamIndex):
+    """``TeamTiming`` per team."""
+    per_team = TeamTiming
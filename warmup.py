@@ -0,0 +1,232 @@
+"""Background warm-up of the dataset and of the popular views' figures.
+
+``start()`` launches one daemon thread per process that loads the dataset
+(building the on-disk cache if needed) and then builds, through the
+memoized ``charts`` builders, every figure of the default view and of the
+configured popular views, so the sessions that ask for them find them in
+``charts.FIGURES``. app.py calls it on its first run and takes its dataset
+from it. To start warming before the first visitor arrives, launch the
+server through this module:
+
+    python warmup.py --serve [streamlit options, e.g. --server.port 8501]
+    python warmup.py                  # warm once in the foreground and print timings
+
+Popular views are the teams in ``DASHBOARD_WARMUP_TEAMS`` (comma-separated,
+default below) times the ``report`` filter presets in
+``DASHBOARD_WARMUP_PRESETS`` (default: "default"); the first team's default
+view is warmed first. ``DASHBOARD_WARMUP=0`` turns the figure warm-up off
+(the dataset is still loaded in the background). Progress is available from
+``Warmup.status()`` and each step is logged on the ``dashboard.warmup``
+logger.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import charts
+from pipeline import Dataset, data_slice
+from report import PRESETS, preset_filters
+
+logger = logging.getLogger("dashboard.warmup")
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+DEFAULT_TEAMS   = ("Argentina", "Brazil", "France", "Germany", "England", "Spain")
+DEFAULT_PRESETS = ("default",)
+
+# Every figure a view shows, by section in the dashboard's order: (builder,
+# whether it takes the year range, whether it takes the tournaments).
+VIEW_FIGURES = [
+    (charts.waterfall,     False, False),
+    (charts.pyramid,       False, False),
+    (charts.radar,         True,  True),
+    (charts.elo_history,   True,  False),
+    (charts.form_history,  True,  False),
+    (charts.box,           True,  True),
+    (charts.top_scorers,   True,  False),
+    (charts.scatter_3d,    True,  True),
+    (charts.rivals,        True,  True),
+    (charts.shootout_pie,  False, False),
+    (charts.goal_timing,   True,  True),
+    (charts.late_goals,    True,  True),
+    (charts.penalty_share, True,  True),
+]
+
+# The forecast section's initial widget state (its bracket is the first of
+# ``charts.brackets``).
+FORECAST = {"runs": 100_000, "seed": 0}
+
+
+def _setting(name, default):
+    value = os.environ.get(name, "")
+    return tuple(item.strip() for item in value.split(",") if item.strip()) or default
+
+
+def popular_views():
+    """``(team, preset)`` pairs to warm, in order, from the environment."""
+    teams   = _setting("DASHBOARD_WARMUP_TEAMS", DEFAULT_TEAMS)
+    presets = []
+    for preset in _setting("DASHBOARD_WARMUP_PRESETS", DEFAULT_PRESETS):
+        if preset in PRESETS:
+            presets.append(preset)
+        else:
+            logger.warning("warm-up: unknown preset %r skipped; expected one of %s",
+                           preset, ", ".join(PRESETS))
+    return [(team, preset) for team in teams for preset in presets or DEFAULT_PRESETS]
+
+
+def load_dataset():
+    """The dataset, sliced as ``pipeline.data_slice`` says."""
+    return Dataset.load(**data_slice())
+
+
+def warm_view(ds, team, preset, bracket=None):
+    """Build (into ``charts.FIGURES``) everything the dashboard shows for one view."""
+    year_range, tournaments = preset_filters(ds, team, preset)
+    year_range = tuple(year_range)
+    ds.cube.team(team).totals(*year_range, tournaments=tournaments)
+    for builder, ranged, filtered in VIEW_FIGURES:
+        params = {"team": team}
+        if ranged:
+            params["year_range"] = year_range
+        if filtered:
+            params["tournaments"] = tournaments
+        builder(ds, **params)
+    if bracket is not None:
+        charts.forecast_chart(ds, team=team, bracket=bracket, **FORECAST)
+
+
+class Warmup:
+    """The warm-up thread's work and progress.
+
+    ``run`` loads the dataset, then warms the streak tables, the default
+    forecast and every view in ``views``; ``status()`` reports progress and
+    per-step timings while it runs.
+    """
+
+    def __init__(self, views, load=load_dataset, figures=True):
+        self.views   = list(views)
+        self.load    = load
+        self.figures = figures
+        self.ds      = None
+        self.error   = None
+        self.steps   = []
+        self.total   = 1 + (2 + len(self.views) if figures else 0)
+        self.started = self.finished = None
+        self.loaded  = threading.Event()
+        self._lock   = threading.Lock()
+        self._reload = threading.Lock()
+
+    def _step(self, name, work):
+        start = time.perf_counter()
+        work()
+        ms = (time.perf_counter() - start) * 1e3
+        with self._lock:
+            self.steps.append((name, ms))
+        logger.info("warm-up %d/%d %s in %.0f ms", len(self.steps), self.total, name, ms)
+
+    def _load(self):
+        self.ds = self.load()
+
+    def run(self):
+        self.started = time.perf_counter()
+        try:
+            try:
+                self._step("load", self._load)
+            finally:
+                self.loaded.set()
+            if self.figures:
+                ds = self.ds
+                self._step("streaks", lambda: [ds.streaks(run) for run in ("unbeaten", "winning")])
+                bracket = next(iter(charts.brackets(ds)), None)
+                if bracket is not None:
+                    self._step("forecast", lambda: charts.title_odds(ds, bracket=bracket, **FORECAST))
+                else:
+                    with self._lock:
+                        self.total -= 1
+                teams = set(ds.teams())
+                for team, preset in self.views:
+                    if team in teams:
+                        self._step(f"{team}/{preset}", lambda: warm_view(ds, team, preset, bracket))
+                    else:
+                        logger.warning("warm-up: unknown team %r skipped", team)
+                        with self._lock:
+                            self.total -= 1
+        except Exception as exc:   # the app keeps working, just colder
+            self.error = exc
+            logger.exception("warm-up failed")
+        finally:
+            self.finished = time.perf_counter()
+            logger.info("warm-up %s", json.dumps(self.status()))
+
+    def dataset(self):
+        """The warm-up's dataset, waiting for it to load.
+
+        If the warm-up's load failed, the load is retried here (one caller at
+        a time) until it succeeds, so a transient error does not stick.
+        """
+        self.loaded.wait()
+        with self._reload:
+            if self.ds is None:
+                logger.warning("warm-up load failed (%r); loading in the foreground", self.error)
+                self.ds = self.load()
+        return self.ds
+
+    def status(self):
+        with self._lock:
+            steps = list(self.steps)
+        end = self.finished or time.perf_counter()
+        return {
+            "state":     ("failed" if self.error else "done" if self.finished
+                          else "running" if self.started else "pending"),
+            "done":      len(steps),
+            "total":     self.total,
+            "elapsed_s": round(end - self.started, 3) if self.started else 0.0,
+            "steps":     [{"name": name, "ms": round(ms, 1)} for name, ms in steps],
+            "error":     repr(self.error) if self.error else None,
+        }
+
+
+_warmup = None
+_start_lock = threading.Lock()
+
+
+def start(views=None):
+    """This process's warm-up, started on the first call (a daemon thread)."""
+    global _warmup
+    with _start_lock:
+        if _warmup is None:
+            _warmup = Warmup(popular_views() if views is None else views,
+                             figures=os.environ.get("DASHBOARD_WARMUP") != "0")
+            threading.Thread(target=_warmup.run, name="dashboard-warmup", daemon=True).start()
+        return _warmup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--serve", action="store_true",
+                        help="start the warm-up, then the dashboard server in this process")
+    args, streamlit_args = parser.parse_known_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.serve:
+        start()
+        from streamlit.web import cli
+        sys.exit(cli.main(["run", APP, *streamlit_args], prog_name="streamlit"))
+
+    warmup = Warmup(popular_views())
+    warmup.run()
+    status = warmup.status()
+    print(f"warmed {status['done']}/{status['total']} steps in {status['elapsed_s']:.1f}s")
+    for step in status["steps"]:
+        print(f"  {step['name']:<28} {step['ms']:>9.0f} ms")
+    return 1 if warmup.error else 0
+
+
+if __name__ == "__main__":
+    import warmup   # the module app.py imports, so --serve and the app share one warm-up
+    sys.exit(warmup.main())